@@ -1,95 +1,132 @@
 import os
-import re
-import docx2txt
-import pdfplumber
+import time
 import pandas as pd
-import numpy as np
 import streamlit as st
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer, util
+from chunking import ChunkStats
+from corpus_store import CorpusStore
+from embedding_store import EmbeddingStore
+from extraction import extraction_pool
+from export import MIME_TYPES, REPORT_FIELDS, available_formats, export_file, report_chunks
+from instrumentation import add_span, instrumented
+from query import QuerySyntaxError, TermIndex, parse_query
+from skills import SECTIONS, SkillIndex, SkillTaxonomy, jd_skill_requirements
+from text_cache import TextCache
+from tfidf_index import TfidfIndex
+from tokens import TokenizedCorpus, token_stream
+from vector_index import META_FILE, load_index
+from ranker import (
+    CORPUS_DB,
+    EMBEDDING_CACHE_DIR,
+    EXTRACTION_WORKERS,
+    TEXT_CACHE_DB,
+    TFIDF_INDEX_DIR,
+    VECTOR_INDEX_DIR,
+    SKILL_TAXONOMY_FILE,
+    Ranking,
+    deduplicate_resumes,
+    filter_by_query,
+    filter_by_skills,
+    iter_resume_batches,
+    keyword_analytics,
+    rank_resumes_bert,
+    rank_resumes_bert_chunked,
+    rank_resumes_cascade,
+    rank_resumes_tfidf,
+    search_vector_index,
+)
+from ranker import load_model as load_sentence_model
+from models import MODEL_NAME, REGISTRY, embedding_key, startup_report
+
+# Resumes are extracted and scored in batches of this size so results appear while the rest are processed
+SCORING_BATCH_SIZE = 25
+LIVE_TOP_K = 10
+RESULTS_PER_PAGE = 10
+EXPORT_FORMAT_LABELS = {"csv": "CSV", "csv.gz": "CSV (gzip)", "jsonl": "JSON Lines", "parquet": "Parquet"}
 
-# Load BERT model (small and fast for demo)
+# BERT model (small and fast for demo), loaded on first use so TF-IDF-only sessions never import torch
 @st.cache_resource
 def load_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+    return load_sentence_model()
 
-model = load_model()
+# Embeddings persist across reruns and sessions, so only new resumes are encoded
+@st.cache_resource
+def load_embedding_store():
+    return EmbeddingStore(EMBEDDING_CACHE_DIR)
 
-# ----------- Text Extraction -----------
-def extract_docx_text(file):
-    try:
-    return docx2txt.process(file)
-    except Exception as e:
-        st.error(f"Error processing {file.name}: {str(e)}")
-        return ""
+# Extracted text survives reruns, so changing a widget doesn't re-parse every file
+@st.cache_resource
+def load_text_cache():
+    return TextCache(db_path=TEXT_CACHE_DB or None)
 
-def extract_pdf_text(file):
-    try:
-    text = ""
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
-    except Exception as e:
-        st.error(f"Error processing {file.name}: {str(e)}")
-        return ""
-
-def load_resume_texts(uploaded_files):
-    resumes = {}
-    for file in uploaded_files:
-        if file.name.endswith(".docx"):
-            text = extract_docx_text(file)
-            if text:
-                resumes[file.name] = text
-        elif file.name.endswith(".pdf"):
-            text = extract_pdf_text(file)
-            if text:
-                resumes[file.name] = text
-    return resumes
-
-# ----------- Preprocess Text -----------
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"[^a-zA-Z0-9 ]", " ", text)
-    return text
-
-# ----------- Keyword Highlighting -----------
-def highlight_keywords(jd_text, resume_text):
-    jd_words = set(clean_text(jd_text).split())
-    resume_words = set(clean_text(resume_text).split())
-    return jd_words.intersection(resume_words)
-
-def get_important_keywords(text, top_n=10):
-    """Extract most important keywords from text"""
-    words = clean_text(text).split()
-    word_freq = {}
-    for word in words:
-        if len(word) > 2:  # Skip short words
-            word_freq[word] = word_freq.get(word, 0) + 1
-    return sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:top_n]
-
-# ----------- TF-IDF Ranking -----------
-def rank_resumes_tfidf(jd_text, resumes):
-    docs = [jd_text] + list(resumes.values())
-    docs = [clean_text(doc) for doc in docs]
-    tfidf = TfidfVectorizer(stop_words='english', max_features=1000)
-    tfidf_matrix = tfidf.fit_transform(docs)
-    scores = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
-    ranked = sorted(zip(resumes.keys(), scores), key=lambda x: x[1], reverse=True)
-    return ranked
-
-# ----------- BERT Semantic Ranking -----------
-def rank_resumes_bert(jd_text, resumes):
-    try:
-    jd_embedding = model.encode(jd_text, convert_to_tensor=True)
-    resume_embeddings = model.encode(list(resumes.values()), convert_to_tensor=True)
-    scores = util.cos_sim(jd_embedding, resume_embeddings)[0]
-    ranked = sorted(zip(resumes.keys(), scores.tolist()), key=lambda x: x[1], reverse=True)
-    return ranked
-    except Exception as e:
-        st.error(f"Error in BERT processing: {str(e)}")
-        return []
+# Extraction workers are spawned once and reused by every run (Streamlit threads can't time out in-process)
+@st.cache_resource
+def load_extraction_pool():
+    return extraction_pool(EXTRACTION_WORKERS)
+
+# Resumes are tokenized into the TF-IDF index once; queries reuse its vocabulary and IDF
+@st.cache_resource
+def load_tfidf_index():
+    return TfidfIndex.load(TFIDF_INDEX_DIR)
+
+# Keyed on the index's modification time so a rebuild is picked up
+@st.cache_resource
+def load_vector_index(path, modified):
+    return load_index(path)
+
+embedding_store = load_embedding_store()
+text_cache = load_text_cache()
+extraction_workers = load_extraction_pool()
+tfidf_index = load_tfidf_index()
+
+# Every resume ever uploaded, deduplicated, so repeat and near-copy uploads are ranked once
+@st.cache_resource
+def load_corpus_store():
+    return CorpusStore(CORPUS_DB, tfidf_index=tfidf_index, embeddings=embedding_store) if CORPUS_DB else None
+
+corpus_store = load_corpus_store()
+
+@st.cache_resource
+def load_skill_taxonomy():
+    return SkillTaxonomy.load(SKILL_TAXONOMY_FILE)
+
+skill_taxonomy = load_skill_taxonomy()
+
+def report_extraction_error(name, error):
+    st.error(f"Error processing {name}: {error}")
+
+def show_live_ranking(placeholder, results):
+    top = results[:LIVE_TOP_K]
+    placeholder.dataframe(
+        pd.DataFrame({
+            "Rank": range(1, len(top) + 1),
+            "Resume": [name for name, _ in top],
+            "Match Score": [round(score, 3) for _, score in top],
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+def show_performance(recorder):
+    snapshot = recorder.snapshot()
+    with st.expander("⏱️ Performance"):
+        spans = sorted(snapshot["spans"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        st.dataframe(pd.DataFrame({
+            "Stage": [name for name, _ in spans],
+            "Calls": [stats["calls"] for _, stats in spans],
+            "Total (s)": [round(stats["total_seconds"], 3) for _, stats in spans],
+            "Mean (ms)": [stats["mean_ms"] for _, stats in spans],
+            "Max (ms)": [stats["max_ms"] for _, stats in spans],
+        }), hide_index=True, use_container_width=True)
+        if snapshot["counters"]:
+            st.markdown("**Counters:** " + ", ".join(f"{name} = {value:,}" for name, value in sorted(snapshot["counters"].items())))
+        if "memory" in snapshot:
+            st.markdown(f"**Memory (tracemalloc):** peak {snapshot['memory']['peak_mb']:.1f} MiB")
+            st.code("\n".join(snapshot["memory"]["top_allocations"]), language=None)
+        if "profile" in snapshot:
+            st.markdown("**cProfile (top functions by cumulative time):**")
+            st.code(snapshot["profile"], language=None)
+        st.download_button("📥 Download metrics (JSON)", data=recorder.to_json(),
+                           file_name="resume_ranker_metrics.json", mime="application/json")
 
 # ----------- Streamlit App -----------
 st.set_page_config(
@@ -287,9 +324,13 @@ with st.sidebar:
     
     method = st.radio(
         "Select Matching Method:",
-        ["BERT Semantic Matching", "TF-IDF (Keyword-Based)"],
-        help="BERT: Understands meaning and synonyms. TF-IDF: Exact keyword matching."
+        ["BERT Semantic Matching", "TF-IDF (Keyword-Based)", "Cascade (TF-IDF → BERT)"],
+        help="BERT: Understands meaning and synonyms. TF-IDF: Exact keyword matching. "
+             "Cascade: TF-IDF shortlists candidates, BERT reranks only the shortlist."
     )
+    if method != "TF-IDF (Keyword-Based)":
+        # Start loading the model while the job description is being written
+        REGISTRY.warm_up(wait=False)
     
     st.markdown("---")
     
@@ -306,6 +347,29 @@ with st.sidebar:
             </ul>
         </div>
         """, unsafe_allow_html=True)
+        chunk_long_resumes = st.checkbox(
+            "Chunk long resumes", value=True,
+            help="The model only reads the first 256 tokens of its input. Chunking embeds every "
+                 "section of a resume and pools the chunk scores."
+        )
+        chunk_pooling = st.selectbox("Chunk pooling", ["max", "mean"], disabled=not chunk_long_resumes,
+                                     help="max: best-matching section wins. mean: average over sections.")
+    elif method == "Cascade (TF-IDF → BERT)":
+        st.markdown("""
+        <div style="background: linear-gradient(135deg, #ede7f6 0%, #d1c4e9 100%); padding: 1rem; border-radius: 10px; border-left: 4px solid #673AB7;">
+            <h4 style="margin: 0 0 0.5rem 0; color: #4527a0;">⚡ Cascade Matching</h4>
+            <ul style="margin: 0; padding-left: 1.2rem; color: #4527a0;">
+                <li>Fast TF-IDF pass shortlists candidates</li>
+                <li>BERT reranks only the shortlist</li>
+                <li>Blends keyword and semantic scores</li>
+                <li>Best for large resume pools</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        shortlist_size = st.slider("Shortlist size", min_value=5, max_value=500, value=50, step=5,
+                                   help="How many TF-IDF top candidates are reranked with BERT")
+        bert_weight = st.slider("BERT weight", min_value=0.0, max_value=1.0, value=0.7, step=0.05,
+                                help="Final score = weight × BERT + (1 − weight) × TF-IDF")
     else:
         st.markdown("""
         <div style="background: linear-gradient(135deg, #fff3e0 0%, #ffe0b2 100%); padding: 1rem; border-radius: 10px; border-left: 4px solid #FF9800;">
@@ -319,6 +383,27 @@ with st.sidebar:
         </div>
         """, unsafe_allow_html=True)
 
+    st.markdown("---")
+
+    with st.expander("🗂️ Saved Resume Index"):
+        vector_index_dir = st.text_input(
+            "Vector index directory",
+            value=VECTOR_INDEX_DIR if os.path.exists(os.path.join(VECTOR_INDEX_DIR, META_FILE)) else "",
+            help="Built with `python index_cli.py build <resume_dir>`. Searched with BERT for every job description."
+        )
+        index_top_k = st.number_input("Top matches from index", min_value=1, max_value=500, value=10)
+
+    profile_run = st.checkbox("Profile analysis (cProfile + tracemalloc)", value=False,
+                              help="Adds a CPU profile and the top memory allocation sites to the Performance panel. "
+                                   "Slows the analysis down noticeably.")
+
+    report = startup_report()
+    model_timings = report["models"].get(embedding_key(MODEL_NAME, REGISTRY.backend))
+    st.caption(
+        f"⏱️ BERT model ({REGISTRY.backend}) " + (f"loaded in {model_timings['load_seconds']:.1f}s" if model_timings else "not loaded yet")
+        + (f"; heavy modules: {', '.join(report['heavy_modules_loaded'])}" if report["heavy_modules_loaded"] else "")
+    )
+
 # Main content area
 col1, col2 = st.columns([1, 1])
 
@@ -335,6 +420,29 @@ with col1:
         placeholder="Paste the complete job description here. The more detailed, the better the matching will be. Include requirements, responsibilities, and preferred qualifications."
     )
 
+    # Skills from the job description's requirements are offered first
+    required_skills, _ = jd_skill_requirements(jd_input, skill_taxonomy) if jd_input else ([], [])
+    must_have_skills = st.multiselect(
+        "Must-have skills",
+        required_skills + [skill for skill in skill_taxonomy.skills if skill not in required_skills],
+        help="Only resumes mentioning every selected skill are scored; the rest are filtered out "
+             "with the skill index before ranking."
+    )
+    query_input = st.text_input(
+        "Requirement query (optional)",
+        placeholder='python AND (aws OR gcp) AND "machine learning"',
+        help="Hard requirements checked before scoring: AND, OR, NOT, parentheses and \"quoted phrases\". "
+             "Terms side by side must all appear. Resumes that fail are not ranked."
+    )
+    query_error = None
+    try:
+        requirement_query = parse_query(query_input)
+    except QuerySyntaxError as e:
+        requirement_query, query_error = None, str(e)
+        st.error(f"❌ Requirement query: {query_error}")
+    if requirement_query is not None:
+        st.caption(f"🔎 Interpreted as: {requirement_query}")
+
 with col2:
     st.markdown("""
     <div style="background: linear-gradient(135deg, #f3e5f5 0%, #e1bee7 100%); padding: 1.5rem; border-radius: 15px; margin-bottom: 1rem;">
@@ -342,9 +450,9 @@ with col2:
     </div>
     """, unsafe_allow_html=True)
     
-uploaded_files = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Upload resume files",
-    type=["docx", "pdf"],
+        type=["docx", "pdf"],
         accept_multiple_files=True,
         help="Supported formats: .docx and .pdf files. You can upload multiple files at once."
     )
@@ -359,7 +467,7 @@ uploaded_files = st.file_uploader(
             """, unsafe_allow_html=True)
 
 # Processing and Results
-if jd_input and uploaded_files:
+if jd_input and uploaded_files and not query_error:
     st.markdown("---")
     st.markdown("""
     <div style="background: linear-gradient(135deg, #fff8e1 0%, #ffecb3 100%); padding: 1.5rem; border-radius: 15px; margin-bottom: 2rem;">
@@ -367,23 +475,135 @@ if jd_input and uploaded_files:
     </div>
     """, unsafe_allow_html=True)
     
-    with st.spinner("🔄 Analyzing resumes with AI..."):
-        resumes = load_resume_texts(uploaded_files)
+    with st.spinner("🔄 Analyzing resumes with AI..."), instrumented(profile_run) as run_metrics:
+        progress = st.progress(0.0, text="Extracting resume text...")
+        live_ranking = st.empty()
+        resumes = {}
+        results = []
+        scored_names, scored_values = [], []
+        seen_documents, duplicate_uploads, near_duplicate_uploads = {}, {}, {}
+        skill_index = SkillIndex(skill_taxonomy)
+        term_index = TermIndex()
+        # Each kept resume is tokenized once; its stream feeds the query index, TF-IDF and keyword analytics
+        tokenized = TokenizedCorpus()
+        # Resumes each stage removed before scoring, in the order the stages run
+        filter_stages = {"duplicates": 0, "must-have skills": 0, "requirement query": 0}
+        chunk_stats = ChunkStats()
+        ranking_failed = False
+        indexed_count = len(tfidf_index)
+
+        def score_batch(batch, streams):
+            if method == "BERT Semantic Matching":
+                if chunk_long_resumes:
+                    ranked, stats = rank_resumes_bert_chunked(
+                        jd_input, batch, model=load_model(), store=embedding_store, pooling=chunk_pooling)
+                    chunk_stats.merge(stats)
+                    return ranked
+                return rank_resumes_bert(jd_input, batch, model=load_model(), store=embedding_store)
+            return rank_resumes_tfidf(jd_input, batch, index=tfidf_index, streams=streams)
 
-        if not resumes:
+        # The cascade needs the whole pool for its TF-IDF shortlist; the other methods score each batch as it lands
+        streaming = method != "Cascade (TF-IDF → BERT)"
+        for batch, files_done, files_total in iter_resume_batches(
+                uploaded_files, batch_size=SCORING_BATCH_SIZE, cache=text_cache,
+                on_error=report_extraction_error, pool=extraction_workers):
+            if corpus_store is not None and batch:
+                batch, duplicates, near_duplicates = deduplicate_resumes(batch, corpus_store, seen_documents)
+                duplicate_uploads.update(duplicates)
+                near_duplicate_uploads.update(near_duplicates)
+                filter_stages["duplicates"] += len(duplicates)
+            if batch:
+                passing = filter_by_skills(batch, must_have_skills, skill_index)
+                filter_stages["must-have skills"] += len(batch) - len(passing)
+                batch = passing
+            streams = {name: token_stream(text) for name, text in batch.items()}
+            if batch and requirement_query is not None:
+                passing = filter_by_query(batch, requirement_query, term_index, streams)
+                filter_stages["requirement query"] += len(batch) - len(passing)
+                batch = passing
+            for name, text in batch.items():
+                tokenized.add(name, text, streams[name])
+            resumes.update(batch)
+            if batch and streaming and not ranking_failed:
+                try:
+                    ranked = score_batch(batch, streams)
+                    scored_names.extend(ranked.names)
+                    scored_values.extend(ranked.all_scores.tolist())
+                    # Only the live top-k is ordered; the detail pages order the rest as they are opened
+                    results = Ranking(scored_names, scored_values)
+                    show_live_ranking(live_ranking, results)
+                except Exception as e:
+                    st.error(f"Error in {method}: {str(e)}")
+                    ranking_failed = True
+            if files_total:
+                progress.progress(files_done / files_total,
+                                  text=f"Processed {files_done}/{files_total} file(s), ranked {len(results)}")
+        progress.empty()
+        if duplicate_uploads:
+            st.info(f"ℹ️ Skipped {len(duplicate_uploads)} duplicate resume(s): " +
+                    ", ".join(f"{name} = {original}" for name, original in duplicate_uploads.items()))
+        if near_duplicate_uploads:
+            st.info(f"ℹ️ Ranked {len(near_duplicate_uploads)} near-duplicate resume(s) on their uploaded text: " +
+                    ", ".join(f"{name} ≈ {original}" for name, original in near_duplicate_uploads.items()))
+
+        if any(filter_stages.values()):
+            st.info(f"🔎 Filtered before scoring: {len(resumes) + sum(filter_stages.values())} extracted → " +
+                    " → ".join(f"{stage} −{removed}" for stage, removed in filter_stages.items() if removed) +
+                    f" → {len(resumes)} scored")
+
+        if not resumes and (filter_stages["must-have skills"] or filter_stages["requirement query"]):
+            st.warning("⚠️ No resume passes the must-have skills and requirement query.")
+        elif not resumes:
             st.error("❌ No valid resume files could be processed. Please check your file formats.")
         else:
             # Rank resumes
-            if method == "BERT Semantic Matching":
-            results = rank_resumes_bert(jd_input, resumes)
-            else:
-                results = rank_resumes_tfidf(jd_input, resumes)
+            if ranking_failed:
+                results = []
+            elif method == "Cascade (TF-IDF → BERT)":
+                try:
+                    results = rank_resumes_cascade(jd_input, resumes, shortlist_size, bert_weight,
+                                                   model=load_model(), store=embedding_store, tfidf_index=tfidf_index)
+                    if len(results) < len(resumes):
+                        st.info(f"ℹ️ BERT reranked the top {len(results)} of {len(resumes)} resumes shortlisted by TF-IDF")
+                except Exception as e:
+                    st.error(f"Error in {method}: {str(e)}")
+                    results = []
+            elif method == "TF-IDF (Keyword-Based)":
+                # IDF may have been refreshed mid-stream; one more sparse mat-vec puts every score on the same IDF
+                results = rank_resumes_tfidf(jd_input, resumes, index=tfidf_index)
+            if len(tfidf_index) != indexed_count:
+                tfidf_index.save(TFIDF_INDEX_DIR)
+            if results:
+                show_live_ranking(live_ranking, results)
+            if chunk_stats.documents:
+                st.caption(
+                    f"Encoded {chunk_stats.chunks} chunk(s) covering {chunk_stats.tokens_encoded:,} of "
+                    f"{chunk_stats.tokens_total:,} tokens ({chunk_stats.tokens_dropped:,} dropped); "
+                    f"whole-resume encoding would have truncated {chunk_stats.tokens_truncated_unchunked:,}"
+                )
 
             if results:
                 st.success(f"✅ Analysis complete! Ranked {len(results)} resume(s)")
+                # Keyword analytics for every resume in one pass, shared by the detail panels and the export
+                keyword_report = keyword_analytics(jd_input, resumes, corpus=tokenized)
+                matched_keywords_by_resume = keyword_report["matched"]
+                if keyword_report["distinctive_terms"]:
+                    st.caption("🎯 Distinctive job description terms: " +
+                               ", ".join(term for term, _ in keyword_report["distinctive_terms"]))
+
+                # Detail panels are paginated so only one page of expanders is built per run
+                page_count = (len(results) + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE
+                page = 1
+                if page_count > 1:
+                    page = st.number_input(f"Result page (1–{page_count})", min_value=1,
+                                           max_value=page_count, value=1, step=1)
+                page_start = (page - 1) * RESULTS_PER_PAGE
+                page_results = results[page_start:page_start + RESULTS_PER_PAGE]
+                skill_ids = {name: doc_id for doc_id, name in enumerate(skill_index.names)}
 
                 # Display results
-        for i, (filename, score) in enumerate(results):
+                render_start = time.perf_counter()
+                for i, (filename, score) in enumerate(page_results, page_start):
                     # Determine score category
                     if score > 0.7:
                         score_class = "score-excellent"
@@ -412,13 +632,24 @@ if jd_input and uploaded_files:
                             """, unsafe_allow_html=True)
                             
                             # Keyword analysis
-            matched_keywords = highlight_keywords(jd_input, resumes[filename])
-            if matched_keywords:
+                            matched_keywords = matched_keywords_by_resume[filename]
+                            if matched_keywords:
                                 st.markdown("**🔑 Matched Keywords:**")
                                 keyword_display = " ".join([f'<span class="keyword-highlight">{kw}</span>' for kw in list(matched_keywords)[:20]])
                                 st.markdown(f'<div style="margin: 1rem 0;">{keyword_display}</div>', unsafe_allow_html=True)
-            else:
+                            else:
                                 st.warning("⚠️ No keyword matches found")
+                            skill_gaps = keyword_report["skill_gaps"].get(filename)
+                            if skill_gaps:
+                                st.markdown("**🧩 Missing Job Description Terms:** " + ", ".join(skill_gaps))
+                            skills_by_section = {}
+                            for skill, sections in sorted(skill_index.skills(skill_ids[filename]).items()):
+                                for section in sections:
+                                    skills_by_section.setdefault(section, []).append(skill)
+                            if skills_by_section:
+                                st.markdown("**🛠 Skills by Section:**\n" + "\n".join(
+                                    f"- *{section}*: {', '.join(skills_by_section[section])}"
+                                    for section in SECTIONS if section in skills_by_section))
                         
                         with col2:
                             # Show resume stats
@@ -439,8 +670,9 @@ if jd_input and uploaded_files:
                             with col_b:
                                 st.metric("Match %", f"{score*100:.1f}%")
                                 st.metric("Keywords", len(matched_keywords))
-        
-        # CSV Export
+                add_span("render.details", time.perf_counter() - render_start)
+
+                # CSV Export
                 st.markdown("---")
                 st.markdown("""
                 <div style="background: linear-gradient(135deg, #e8f5e8 0%, #c8e6c9 100%); padding: 1.5rem; border-radius: 15px; margin-bottom: 2rem;">
@@ -448,30 +680,20 @@ if jd_input and uploaded_files:
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Create detailed DataFrame
-                export_data = []
-                for filename, score in results:
-                    matched_keywords = highlight_keywords(jd_input, resumes[filename])
-                    keyword_count = len(matched_keywords)
-                    export_data.append({
-                        "Resume": filename,
-                        "Match Score": round(score, 3),
-                        "Match Percentage": f"{score*100:.1f}%",
-                        "Matched Keywords": len(matched_keywords),
-                        "Keyword List": ", ".join(list(matched_keywords)[:10])
-                    })
-                
-                df = pd.DataFrame(export_data)
-                
                 col1, col2 = st.columns(2)
                 with col1:
-        csv_data = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-                        label="📥 Download CSV Report",
-            data=csv_data,
-                        file_name="resume_rankings_detailed.csv",
-                        mime="text/csv",
-                        help="Download detailed ranking results as CSV"
+                    # Written in chunks from the scores and matched keywords computed above
+                    export_format = st.selectbox("Report format", available_formats(),
+                                                 format_func=EXPORT_FORMAT_LABELS.get)
+                    with export_file(report_chunks(results, matched_keywords_by_resume),
+                                     export_format, REPORT_FIELDS) as report:
+                        report_data = report.read()
+                    st.download_button(
+                        label="📥 Download Report",
+                        data=report_data,
+                        file_name=f"resume_rankings_detailed.{export_format}",
+                        mime=MIME_TYPES[export_format],
+                        help="Download detailed ranking results"
                     )
                 
                 with col2:
@@ -481,13 +703,15 @@ if jd_input and uploaded_files:
                         <h5 style="margin: 0 0 1rem 0; color: #e65100;">📈 Summary Statistics</h5>
                     </div>
                     """, unsafe_allow_html=True)
-                    avg_score = df["Match Score"].mean()
-                    max_score = df["Match Score"].max()
+                    avg_score = results.all_scores.mean()
+                    max_score = results.all_scores.max()
                     st.metric("Average Score", f"{avg_score:.3f}")
                     st.metric("Best Match", f"{max_score:.3f}")
             else:
                 st.error("❌ Error in processing. Please try again.")
 
+    show_performance(run_metrics)
+
 elif not jd_input and uploaded_files:
     st.info("ℹ️ Please enter a job description to start the analysis.")
 elif jd_input and not uploaded_files:
@@ -495,6 +719,26 @@ elif jd_input and not uploaded_files:
 else:
     st.info("ℹ️ Please provide both a job description and resume files to begin analysis.")
 
+# Saved Index Search
+if jd_input and vector_index_dir:
+    index_meta = os.path.join(vector_index_dir, META_FILE)
+    if not os.path.exists(index_meta):
+        st.warning(f"⚠️ No vector index found in {vector_index_dir}")
+    else:
+        st.markdown("---")
+        st.markdown("""
+        <div style="background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%); padding: 1.5rem; border-radius: 15px; margin-bottom: 2rem;">
+            <h3 style="margin: 0; color: #1976d2; text-align: center;">🗂️ Top Matches from Saved Index</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        try:
+            vector_index = load_vector_index(vector_index_dir, os.path.getmtime(index_meta))
+            matches = search_vector_index([jd_input], vector_index, int(index_top_k), load_model(), embedding_store)[0]
+            st.caption(f"Searched {len(vector_index):,} indexed resume(s) with the {vector_index.kind} backend")
+            st.dataframe(pd.DataFrame(matches, columns=["Resume", "Match Score"]), use_container_width=True)
+        except Exception as e:
+            st.error(f"Error searching vector index: {str(e)}")
+
 # Footer
 st.markdown("""
 <div class="footer">
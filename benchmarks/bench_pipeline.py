@@ -0,0 +1,264 @@
+"""
+End-to-end benchmark of the ranking pipeline on a synthetic corpus.
+
+Streams `--size` resumes from synthetic_corpus.py, so only their names, the
+embedding sample and the indexes stay in memory, and times each stage:
+
+    extraction        .txt/.pdf/.docx bytes -> text through the extraction worker pool (per document)
+    cleaning          single-pass tokenization (per batch)
+    tfidf_index       adding resumes to the incremental TF-IDF index (per batch)
+    tfidf_query       scoring one JD against the index plus top-k (per JD)
+    embedding         encoding resumes with the configured encoder backend (per batch)
+    bert_scoring      JD x corpus matrix multiply plus top-k (per JD)
+    keyword_analysis  matched/top/distinctive/gap terms (per JD; corpus build reported separately)
+    export            writing every ranking row as CSV through export.py (per JD)
+
+Each stage reports items, wall seconds, throughput, p50/p99 latency of its
+unit of work and the process's peak RSS once the stage finished (a running
+high-water mark). Results are JSON, tagged with the git commit, so runs can be
+compared across commits:
+
+    python benchmarks/bench_pipeline.py --size 10000 -o bench_10k.json
+    python benchmarks/bench_pipeline.py --size 10000 --compare bench_10k.json
+
+Embedding is limited to `--embed-limit` resumes (the model is the slowest
+stage by far); bert_scoring then scores the JD against those embeddings
+repeated up to the corpus size, so the multiply still runs at full scale.
+Extraction renders the first `--extract-limit` resumes as an even mix of
+.txt, .pdf and .docx files. Without a loadable model the
+embedding stage is reported as skipped and scoring uses random unit vectors.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from export import ExportWriter, ranking_chunks  # noqa: E402
+from extraction import extraction_pool, iter_extract_texts  # noqa: E402
+from models import BACKENDS, REGISTRY  # noqa: E402
+from ranker import Ranking, encode_texts, top_k_per_row  # noqa: E402
+from synthetic_corpus import iter_corpus, iter_documents, synthetic_job_descriptions  # noqa: E402
+from tfidf_index import TfidfIndex  # noqa: E402
+from tokens import TokenizedCorpus, token_stream  # noqa: E402
+
+STAGES = ("extraction", "cleaning", "tfidf_index", "tfidf_query", "embedding", "bert_scoring",
+          "keyword_analysis", "export")
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB on Linux
+
+
+class Stage:
+    """Latencies of one stage's units of work"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.latencies = []
+        self.extra = {}
+
+    def time(self, fn, items=1):
+        start = time.perf_counter()
+        result = fn()
+        self.latencies.append(time.perf_counter() - start)
+        self.items += items
+        return result
+
+    def summary(self):
+        seconds = sum(self.latencies)
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        return {
+            "items": self.items,
+            "seconds": round(seconds, 4),
+            "items_per_second": round(self.items / seconds, 1) if seconds else None,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "peak_rss_mb": peak_rss_mb(),
+            **self.extra,
+        }
+
+
+def batches(items, size):
+    """Lists of up to `size` items from any iterable"""
+    items = iter(items)
+    batch = list(islice(items, size))
+    while batch:
+        yield batch
+        batch = list(islice(items, size))
+
+
+def tiled_scores(embeddings, query, size):
+    """Scores of `query` against `embeddings` tiled to `size` rows, one block at a time"""
+    block = embeddings @ query
+    return np.concatenate([block[:min(len(block), size - start)] for start in range(0, size, len(block))])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = {}
+    jds = synthetic_job_descriptions(args.queries, args.seed)
+
+    stage = Stage("extraction")
+    formats = Counter()
+    completed = [time.perf_counter()]
+    # One pool for the whole run, as in the app; latency is the gap between completions
+    with extraction_pool(args.workers) as pool:
+        sample = iter_documents(min(args.extract_limit, args.size), args.seed)
+        for batch in batches(sample, args.batch_size):
+            formats.update(os.path.splitext(name)[1].lstrip(".") for name, _ in batch)
+            for _, _, _, error in iter_extract_texts(batch, max_workers=args.workers, pool=pool):
+                completed.append(time.perf_counter())
+                stage.extra["errors"] = stage.extra.get("errors", 0) + (error is not None)
+    stage.latencies = np.diff(completed).tolist()
+    stage.items = len(stage.latencies)
+    stage.extra["startup_ms"] = round(stage.latencies[0] * 1000, 3) if stage.latencies else 0.0
+    stage.extra["formats"] = dict(formats)
+    results["extraction"] = stage.summary()
+
+    # Cleaning, indexing and the keyword corpus share one streamed pass over the resumes;
+    # only names, the embedding sample and the indexes are kept
+    cleaning, indexing = Stage("cleaning"), Stage("tfidf_index")
+    index = TfidfIndex()
+    corpus = TokenizedCorpus()
+    names, sample = [], []
+    corpus_build_seconds = 0.0
+    for batch in batches(iter_corpus(args.size, args.seed), args.batch_size):
+        texts = [text for _, text, _ in batch]
+        cleaning.time(lambda: [token_stream(text) for text in texts], len(texts))
+        indexing.time(lambda: index.ensure(texts), len(texts))
+        start = time.perf_counter()
+        for name, text, _ in batch:
+            corpus.add(name, text)
+        corpus_build_seconds += time.perf_counter() - start
+        names.extend(name for name, _, _ in batch)
+        sample.extend(texts[:args.embed_limit - len(sample)])
+    indexing.time(index.refresh_idf, 0)
+    results["cleaning"] = cleaning.summary()
+    results["tfidf_index"] = indexing.summary()
+
+    stage = Stage("tfidf_query")
+    for _, jd_text in jds:
+        stage.time(lambda: top_k_per_row(index.score_many([jd_text])[0], args.top_k))
+    results["tfidf_query"] = stage.summary()
+
+    stage = Stage("embedding")
+    embeddings = None
+    if "embedding" not in args.skip:
+        try:
+            model = REGISTRY.get()
+            embeddings = np.vstack([stage.time(lambda: encode_texts(batch, model), len(batch))
+                                    for batch in batches(sample, args.batch_size)])
+            results["embedding"] = stage.summary()
+        except Exception as e:  # no model available offline, missing optional backend, ...
+            results["embedding"] = {"skipped": f"{type(e).__name__}: {e}"}
+    else:
+        results["embedding"] = {"skipped": "--skip embedding"}
+    del sample
+
+    stage = Stage("bert_scoring")
+    if embeddings is not None:
+        jd_embeddings = encode_texts([jd for _, jd in jds], model)
+    else:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((min(args.size, args.embed_limit) + len(jds), 384)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        jd_embeddings, embeddings = vectors[:len(jds)], vectors[len(jds):]
+    for jd_embedding in jd_embeddings:
+        stage.time(lambda: top_k_per_row(tiled_scores(embeddings, jd_embedding, len(names))[None, :], args.top_k))
+    results["bert_scoring"] = stage.summary()
+
+    stage = Stage("keyword_analysis")
+    stage.extra["corpus_build_seconds"] = round(corpus_build_seconds, 4)
+    for _, jd_text in jds:
+        stage.time(lambda: corpus.keyword_report(jd_text))
+    results["keyword_analysis"] = stage.summary()
+
+    stage = Stage("export")
+    for jd_id, jd_text in jds:
+        scores = index.score_many([jd_text])[0][0]
+        overlaps = corpus.keyword_overlap_counts(jd_text)
+
+        def export():
+            out = io.BytesIO()
+            with ExportWriter(out, "csv") as writer:
+                writer.write_all(ranking_chunks(Ranking(names, scores), overlaps=overlaps, constants={"jd_id": jd_id}))
+            return out.tell()
+        stage.time(export, len(names))
+    results["export"] = stage.summary()
+    return results
+
+
+def compare(current, baseline):
+    """Print items/second of each stage against a previous run"""
+    print(f"{'stage':<18}{'baseline/s':>14}{'current/s':>14}{'change':>10}", file=sys.stderr)
+    for name in STAGES:
+        old = baseline["stages"].get(name, {}).get("items_per_second")
+        new = current["stages"].get(name, {}).get("items_per_second")
+        change = f"{(new / old - 1) * 100:+.1f}%" if old and new else "n/a"
+        print(f"{name:<18}{old or '-':>14}{new or '-':>14}{change:>10}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on a synthetic corpus.")
+    parser.add_argument("--size", type=int, default=1000, help="Number of synthetic resumes (1k-1M)")
+    parser.add_argument("--queries", type=int, default=5, help="Job descriptions to score")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction worker processes")
+    parser.add_argument("--extract-limit", type=int, default=10_000, help="Resumes sent through extraction")
+    parser.add_argument("--embed-limit", type=int, default=2_000, help="Resumes encoded with the model")
+    parser.add_argument("--encoder-backend", choices=BACKENDS, default=REGISTRY.backend)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["embedding"], help="Stages to skip")
+    parser.add_argument("--output", "-o", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Previous results JSON to compare throughput against")
+    args = parser.parse_args(argv)
+    REGISTRY.configure(backend=args.encoder_backend, batch_size=min(args.batch_size, 64))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "stages": run(args),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
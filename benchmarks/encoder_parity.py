@@ -0,0 +1,93 @@
+"""
+Parity check: an encoder backend against the PyTorch fp32 embeddings.
+
+Encodes the sample job description and resumes (whole and section by
+section) with both backends and reports:
+
+- cosine agreement: cosine between each text's fp32 and candidate embedding
+- rank correlation: Spearman correlation of all pairwise similarities, and
+  whether the JD ranks the sample resumes in the same order
+- throughput of each backend
+
+Exits non-zero when agreement falls below the thresholds.
+
+    python benchmarks/encoder_parity.py --backend torch-int8 --threads 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import split_sections  # noqa: E402
+from models import BACKENDS, MODEL_NAME, ModelRegistry  # noqa: E402
+from sample_resumes import MEDIUM_MATCH_RESUME, SAMPLE_JD, STRONG_MATCH_RESUME, WEAK_MATCH_RESUME  # noqa: E402
+
+RESUMES = [STRONG_MATCH_RESUME, MEDIUM_MATCH_RESUME, WEAK_MATCH_RESUME]
+
+
+def parity_texts():
+    texts = [SAMPLE_JD] + RESUMES
+    for document in texts[:]:
+        texts.extend(section for section in split_sections(document) if len(section.split()) >= 5)
+    return texts
+
+
+def encode(model, texts, batch_size, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+        best = min(best, time.perf_counter() - start)
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    return embeddings, best
+
+
+def compare(reference, candidate):
+    from scipy.stats import spearmanr
+    cosines = np.sum(reference * candidate, axis=1)
+    upper = np.triu_indices(len(reference), k=1)
+    correlation = spearmanr((reference @ reference.T)[upper], (candidate @ candidate.T)[upper]).statistic
+    resumes = slice(1, 1 + len(RESUMES))
+    same_order = bool(np.array_equal(np.argsort(-(reference[resumes] @ reference[0])),
+                                     np.argsort(-(candidate[resumes] @ candidate[0]))))
+    return {
+        "cosine_mean": round(float(cosines.mean()), 5),
+        "cosine_min": round(float(cosines.min()), 5),
+        "spearman_pairwise": round(float(correlation), 5),
+        "sample_ranking_matches": same_order,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=BACKENDS, default="torch-int8", help="Backend to check against torch fp32")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: library default)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs; the best is reported")
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--min-spearman", type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(threads=args.threads, batch_size=args.batch_size)
+    texts = parity_texts()
+    reference, reference_seconds = encode(registry.get(args.model, "torch"), texts, args.batch_size, args.repeat)
+    candidate, candidate_seconds = encode(registry.get(args.model, args.backend), texts, args.batch_size, args.repeat)
+
+    report = {"backend": args.backend, "texts": len(texts), **compare(reference, candidate),
+              "fp32_texts_per_second": round(len(texts) / reference_seconds, 1),
+              "backend_texts_per_second": round(len(texts) / candidate_seconds, 1)}
+    print(json.dumps(report, indent=2))
+    passed = (report["cosine_min"] >= args.min_cosine and report["spearman_pairwise"] >= args.min_spearman
+              and report["sample_ranking_matches"])
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Load replay against the ranking service (service.py).
+
+Reads job descriptions from a JSONL file, one per line, taking the text from
+the "text", "job_description" or "body" field (with "title" prepended when
+present); benchmarks/job_descriptions.jsonl is the default fixture.
+Each JD is ranked against the same resume pool by `--clients` concurrent
+keep-alive connections until `--requests` requests were sent:
+
+    python service.py --port 8080 &
+    python benchmarks/replay_load.py --clients 16 --requests 400
+
+Reports throughput, latency percentiles, how many requests the service shed
+with 503, and the service's batching statistics (requests and texts per
+encode batch) from /health.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sample_resumes import MEDIUM_MATCH_RESUME, STRONG_MATCH_RESUME, WEAK_MATCH_RESUME  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+
+
+def load_job_descriptions(path):
+    jds = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("job_description") or record.get("body") or ""
+            if record.get("title"):
+                text = f"{record['title']}\n\n{text}"
+            if text.strip():
+                jds.append(text)
+    return jds
+
+
+def resume_pool(args):
+    if args.resume_dir:
+        resumes = {}
+        for name in sorted(os.listdir(args.resume_dir)):
+            if name.endswith(".txt"):
+                with open(os.path.join(args.resume_dir, name), encoding="utf-8") as f:
+                    resumes[name] = f.read()
+        return resumes
+    if args.synthetic:
+        return generate_corpus(args.synthetic, args.seed)
+    return {"strong_match_resume.txt": STRONG_MATCH_RESUME, "medium_match_resume.txt": MEDIUM_MATCH_RESUME,
+            "weak_match_resume.txt": WEAK_MATCH_RESUME}
+
+
+class Client:
+    """One keep-alive connection per thread"""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay job descriptions against the ranking service.")
+    parser.add_argument("jd_file", nargs="?", default=os.path.join(ROOT, "benchmarks", "job_descriptions.jsonl"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--method", choices=["bert", "tfidf"], default="bert")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (JDs are cycled)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--resume-dir", help="Directory of .txt resumes sent with every request")
+    parser.add_argument("--synthetic", type=int, default=0, help="Send this many synthetic resumes instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    jds = load_job_descriptions(args.jd_file)
+    if not jds:
+        print(f"No job descriptions in {args.jd_file}", file=sys.stderr)
+        return 1
+    resumes = resume_pool(args)
+    bodies = [json.dumps({"job_description": jd, "resumes": resumes, "method": args.method,
+                          "top_k": args.top_k}).encode("utf-8") for jd in jds]
+    client = Client(args.host, args.port, args.timeout)
+
+    def send(body):
+        start = time.perf_counter()
+        try:
+            status, _ = client.request("POST", "/rank", body)
+        except (OSError, http.client.HTTPException):
+            status = None
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(send, islice(cycle(bodies), args.requests)))
+    seconds = time.perf_counter() - start
+
+    latencies = np.array([latency for status, latency in results if status == 200] or [0.0]) * 1000
+    statuses = [status for status, _ in results]
+    _, health = client.request("GET", "/health")
+    report = {
+        "requests": len(results),
+        "ok": statuses.count(200),
+        "rejected_503": statuses.count(503),
+        "errors": len(results) - statuses.count(200) - statuses.count(503),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(results) / seconds, 1),
+        "resumes_per_request": len(resumes),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "service": json.loads(health),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Synthetic resume corpora for benchmarking the Smart Resume Ranker.
+
+Resumes are assembled from section templates (summary, skills, experience,
+education) with skills drawn from vocabularies modeled on `SAMPLE_JD`: the
+skills the job description asks for, adjacent engineering skills, and
+unrelated (marketing/sales) skills. Each resume gets a match level, so a
+corpus has the same strong/medium/weak mix as the sample files, at any size.
+Generation is deterministic for a given seed and streams, so 1M resumes never
+have to be held in memory at once. Resumes can also be rendered as PDF (a
+minimal file with a real text layer, written without a PDF library) or DOCX
+(python-docx), so extraction can be measured on the formats users upload.
+
+    python benchmarks/synthetic_corpus.py 10000 /tmp/resumes                  # write .txt files
+    python benchmarks/synthetic_corpus.py 3000 /tmp/resumes --format mixed    # .txt, .pdf and .docx
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_resumes import SAMPLE_JD  # noqa: E402
+
+# Skills the sample JD asks for
+JD_SKILLS = [
+    "Python", "TensorFlow", "PyTorch", "machine learning", "neural networks", "data preprocessing",
+    "feature engineering", "model evaluation", "AWS", "Azure", "GCP", "MLOps", "model deployment",
+    "statistics", "mathematics", "Spark", "Hadoop", "NLP", "computer vision", "reinforcement learning",
+    "A/B testing", "ML pipelines", "deep learning",
+]
+# Engineering skills near the JD (medium matches)
+ADJACENT_SKILLS = [
+    "Java", "C++", "C#", "JavaScript", "Node.js", "React", "SQL", "PostgreSQL", "MongoDB", "Redis",
+    "Docker", "Kubernetes", "CI/CD", "REST APIs", "microservices", "Git", "Linux", "Scala", "Go",
+    ".NET", "Kafka", "Airflow", "Tableau", "pandas", "NumPy", "scikit-learn",
+]
+# Skills unrelated to the JD (weak matches)
+UNRELATED_SKILLS = [
+    "social media marketing", "SEO", "content strategy", "Google Analytics", "brand management",
+    "campaign planning", "copywriting", "event planning", "public relations", "customer success",
+    "sales forecasting", "Salesforce", "HubSpot", "budgeting", "negotiation", "email marketing",
+]
+TITLES = {
+    "strong": ["Machine Learning Engineer", "Senior ML Engineer", "Data Scientist", "AI Engineer"],
+    "medium": ["Software Engineer", "Full Stack Developer", "Backend Developer", "Data Engineer"],
+    "weak": ["Marketing Manager", "Sales Associate", "Content Strategist", "Account Executive"],
+}
+# Fraction of skills drawn from each vocabulary per match level
+SKILL_MIX = {
+    "strong": (0.7, 0.25, 0.05),
+    "medium": (0.25, 0.65, 0.10),
+    "weak": (0.05, 0.15, 0.80),
+}
+MATCH_LEVELS = ("strong", "medium", "weak")
+COMPANIES = ["TechCorp Inc.", "AI Startup", "Analytics Corp", "Global Retail", "FinServ Group",
+             "HealthTech", "Media Labs", "CloudWorks", "DataNest", "BrightPath"]
+ACHIEVEMENTS = [
+    "Developed and deployed {skill} solutions used by {n}k customers",
+    "Built automated {skill} workflows reducing turnaround time by {n}%",
+    "Led a team of {small} engineers delivering {skill} projects",
+    "Optimized {skill} performance, cutting costs by {n}%",
+    "Collaborated with stakeholders to roll out {skill} across {small} business units",
+    "Designed dashboards and reports on {skill} adoption",
+    "Mentored junior colleagues in {skill} and {other}",
+]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Arts in Marketing", "Master of Business Administration",
+           "Bachelor of Science in Mathematics", "Bachelor of Engineering in Electronics"]
+UNIVERSITIES = ["Stanford University", "UC Berkeley", "State University", "MIT", "University of Texas",
+                "Georgia Tech", "University of Michigan"]
+
+
+def _pick_skills(rng, level, count):
+    jd, adjacent, unrelated = SKILL_MIX[level]
+    skills = []
+    for _ in range(count):
+        roll = rng.random()
+        vocabulary = JD_SKILLS if roll < jd else ADJACENT_SKILLS if roll < jd + adjacent else UNRELATED_SKILLS
+        skills.append(rng.choice(vocabulary))
+    return list(dict.fromkeys(skills))
+
+
+def synthetic_resume(rng, index, level=None, jobs=None):
+    """One resume as (name, text, match_level)"""
+    level = level or rng.choices(MATCH_LEVELS, weights=(1, 2, 3))[0]
+    skills = _pick_skills(rng, level, rng.randint(8, 20))
+    title = rng.choice(TITLES[level])
+    lines = [f"CANDIDATE {index}", title, f"candidate{index}@email.com | (555) {index % 1000:03d}-{index % 10000:04d}", "",
+             "PROFESSIONAL SUMMARY",
+             f"{title} with {rng.randint(1, 15)}+ years of experience in {', '.join(skills[:3])}.", "",
+             "TECHNICAL SKILLS", ", ".join(skills), "",
+             "PROFESSIONAL EXPERIENCE"]
+    year = 2024
+    for _ in range(jobs or rng.randint(1, 4)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES[level])} | {rng.choice(COMPANIES)} | {start}-{year}")
+        for template in rng.sample(ACHIEVEMENTS, rng.randint(2, 5)):
+            lines.append("• " + template.format(skill=rng.choice(skills), other=rng.choice(skills),
+                                                 n=rng.randint(5, 90), small=rng.randint(2, 9)))
+        year = start
+    lines += ["", "EDUCATION", f"{rng.choice(DEGREES)} | {rng.choice(UNIVERSITIES)} | {year - rng.randint(0, 3)}"]
+    return f"resume_{index:07d}.txt", "\n".join(lines) + "\n", level
+
+
+def iter_corpus(size, seed=0):
+    """Yield (name, text, match_level) for `size` resumes"""
+    rng = random.Random(seed)
+    for index in range(size):
+        yield synthetic_resume(rng, index)
+
+
+def generate_corpus(size, seed=0):
+    """{name: text} for `size` resumes"""
+    return {name: text for name, text, _ in iter_corpus(size, seed)}
+
+
+# ----------- Documents -----------
+DOCUMENT_FORMATS = ("txt", "pdf", "docx")
+PDF_LINES_PER_PAGE = 60
+
+
+def _pdf_string(line):
+    escaped = line.encode("cp1252", errors="replace").replace(b"\\", b"\\\\")
+    return b"(" + escaped.replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def resume_pdf(text, lines_per_page=PDF_LINES_PER_PAGE):
+    """`text` as PDF bytes: Helvetica text objects, one per line, `lines_per_page` lines a page"""
+    lines = text.splitlines() or [""]
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in pages:
+        content = b"BT /F1 10 Tf 12 TL 50 770 Td " + b" ".join(_pdf_string(line) + b" '" for line in page) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def resume_docx(text):
+    """`text` as .docx bytes, one paragraph per line"""
+    import docx  # python-docx, only needed when DOCX samples are generated
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def render_document(name, text, fmt):
+    """(name with the format's extension, file bytes) for one resume"""
+    name = os.path.splitext(name)[0] + "." + fmt
+    if fmt == "pdf":
+        return name, resume_pdf(text)
+    if fmt == "docx":
+        return name, resume_docx(text)
+    return name, text.encode("utf-8")
+
+
+def iter_documents(size, seed=0, formats=DOCUMENT_FORMATS):
+    """Yield (name, bytes) for `size` resumes, cycling through `formats`"""
+    for index, (name, text, _) in enumerate(iter_corpus(size, seed)):
+        yield render_document(name, text, formats[index % len(formats)])
+
+
+def synthetic_job_descriptions(count, seed=0):
+    """`SAMPLE_JD` plus variants that ask for a different mix of the JD and adjacent skills"""
+    rng = random.Random(seed)
+    jds = [("sample_jd", SAMPLE_JD)]
+    for i in range(1, count):
+        skills = rng.sample(JD_SKILLS, 8) + rng.sample(ADJACENT_SKILLS, 4)
+        requirements = "\n".join(f"- Experience with {skill}" for skill in skills)
+        jds.append((f"jd_{i}", f"{rng.choice(TITLES['strong'] + TITLES['medium'])}\n\nRequirements:\n{requirements}\n"))
+    return jds[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus as files.")
+    parser.add_argument("size", type=int, help="Number of resumes")
+    parser.add_argument("output_dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=DOCUMENT_FORMATS + ("mixed",), default="txt",
+                        help="File format; mixed cycles through txt, pdf and docx")
+    args = parser.parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    formats = DOCUMENT_FORMATS if args.format == "mixed" else (args.format,)
+    for name, data in iter_documents(args.size, args.seed, formats):
+        with open(os.path.join(args.output_dir, name), "wb") as f:
+            f.write(data)
+    print(f"Wrote {args.size} resume(s) to {args.output_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
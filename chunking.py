@@ -0,0 +1,164 @@
+"""
+Chunked embedding of long resumes for the Smart Resume Ranker.
+
+all-MiniLM-L6-v2 silently truncates its input at `max_seq_length` tokens, so
+the tail of a long resume never reaches the model. Here each resume is split
+along its section headings (SKILLS, EXPERIENCE, ...), small neighbouring
+sections are merged and oversized ones are cut into overlapping token windows
+that fit the model. Chunk scores are pooled back into one score per resume.
+"""
+
+import re
+
+import numpy as np
+
+HEADING_WORDS = {
+    "summary", "professional summary", "objective", "profile", "skills", "technical skills",
+    "experience", "professional experience", "work experience", "employment", "education",
+    "projects", "certifications", "publications", "awards", "languages", "interests",
+}
+POOLING_METHODS = ("max", "mean")
+
+
+class ChunkStats:
+    """Token accounting for one chunking run"""
+
+    def __init__(self):
+        self.documents = 0
+        self.chunks = 0
+        self.tokens_total = 0
+        self.tokens_encoded = 0
+        self.tokens_unchunked = 0  # what whole-document encoding would have kept
+
+    @property
+    def tokens_dropped(self):
+        return self.tokens_total - self.tokens_encoded
+
+    @property
+    def tokens_truncated_unchunked(self):
+        return self.tokens_total - self.tokens_unchunked
+
+    def merge(self, other):
+        """Add another run's counts into this one"""
+        self.documents += other.documents
+        self.chunks += other.chunks
+        self.tokens_total += other.tokens_total
+        self.tokens_encoded += other.tokens_encoded
+        self.tokens_unchunked += other.tokens_unchunked
+        return self
+
+    def as_dict(self):
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "tokens_total": self.tokens_total,
+            "tokens_encoded": self.tokens_encoded,
+            "tokens_dropped": self.tokens_dropped,
+            "tokens_truncated_unchunked": self.tokens_truncated_unchunked,
+        }
+
+
+# ----------- Tokens -----------
+def token_spans(text, tokenizer=None):
+    """(start, end) character spans of the model's tokens, or of words without a fast tokenizer"""
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                            truncation=False, verbose=False)
+        return encoded["offset_mapping"]
+    return [m.span() for m in re.finditer(r"\S+", text)]
+
+
+def max_chunk_tokens(model):
+    """Token budget per chunk: the model's sequence limit minus [CLS]/[SEP]"""
+    return max(int(getattr(model, "max_seq_length", None) or 256) - 2, 16)
+
+
+# ----------- Chunking -----------
+def _is_heading(line):
+    stripped = line.strip().rstrip(":")
+    if not stripped or len(stripped) > 40 or not stripped[0].isalpha():
+        return False
+    return stripped.lower() in HEADING_WORDS or stripped.isupper()
+
+
+def split_sections(text):
+    """Split a resume into sections, each starting at a heading line"""
+    sections, current = [], []
+    for line in text.splitlines(keepends=True):
+        if _is_heading(line) and any(l.strip() for l in current):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        sections.append("".join(current))
+    return sections
+
+
+def chunk_document(text, tokenizer=None, max_tokens=254, overlap=32):
+    """Return [(chunk_text, n_tokens)] covering the whole document"""
+    pieces = []
+    for section in split_sections(text) or [text]:
+        spans = token_spans(section, tokenizer)
+        if not spans:
+            continue
+        if len(spans) <= max_tokens:
+            pieces.append((section, len(spans)))
+            continue
+        stride = max(max_tokens - overlap, 1)
+        for start in range(0, len(spans), stride):
+            window = spans[start:start + max_tokens]
+            pieces.append((section[window[0][0]:window[-1][1]], len(window)))
+            if start + max_tokens >= len(spans):
+                break
+    # Merge consecutive small sections so chunks stay close to the model's budget
+    chunks = []
+    for piece, n_tokens in pieces:
+        if chunks and chunks[-1][1] + n_tokens <= max_tokens:
+            chunks[-1] = (chunks[-1][0] + piece, chunks[-1][1] + n_tokens)
+        else:
+            chunks.append((piece, n_tokens))
+    return chunks
+
+
+def chunk_resumes(texts, model=None, max_tokens=None, overlap=32, max_chunks=None):
+    """Chunk every resume; returns (chunk_texts, owners, token_counts, stats)"""
+    tokenizer = getattr(model, "tokenizer", None)
+    max_tokens = max_tokens or max_chunk_tokens(model)
+    stats = ChunkStats()
+    chunk_texts, owners, token_counts = [], [], []
+    for owner, text in enumerate(texts):
+        chunks = chunk_document(text, tokenizer, max_tokens, overlap)
+        total = len(token_spans(text, tokenizer))
+        stats.documents += 1
+        stats.tokens_total += total
+        stats.tokens_unchunked += min(total, max_tokens)
+        kept = chunks[:max_chunks] if max_chunks else chunks
+        # Overlapping windows re-encode some tokens; count each document token once
+        stats.tokens_encoded += min(total, sum(n for _, n in kept))
+        for chunk, n_tokens in kept:
+            chunk_texts.append(chunk)
+            owners.append(owner)
+            token_counts.append(n_tokens)
+    stats.chunks = len(chunk_texts)
+    return chunk_texts, np.array(owners, dtype=np.int64), np.array(token_counts, dtype=np.int64), stats
+
+
+def length_bucketed_order(token_counts):
+    """Encode order that groups chunks of similar length to minimize padding"""
+    return np.argsort(token_counts, kind="stable")
+
+
+# ----------- Pooling -----------
+def pool_scores(chunk_scores, owners, n_documents, pooling="max"):
+    """Reduce per-chunk scores to one score per document"""
+    if pooling not in POOLING_METHODS:
+        raise ValueError(f"Unknown pooling '{pooling}' (choose from {', '.join(POOLING_METHODS)})")
+    chunk_scores = np.asarray(chunk_scores, dtype=np.float64)
+    if pooling == "max":
+        pooled = np.full(n_documents, -np.inf)
+        np.maximum.at(pooled, owners, chunk_scores)
+        pooled[np.isneginf(pooled)] = 0.0
+        return pooled
+    sums = np.bincount(owners, weights=chunk_scores, minlength=n_documents)
+    counts = np.bincount(owners, minlength=n_documents)
+    return sums / np.maximum(counts, 1)
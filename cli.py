@@ -0,0 +1,308 @@
+"""
+Headless batch ranking for the Smart Resume Ranker.
+
+Ranks every resume in a directory against one or more job descriptions and
+streams the results as CSV, gzip CSV, JSONL or Parquet (by `--format` or the
+output extension, see export.py):
+
+    python cli.py resumes/ jds.jsonl --method bert --output rankings.csv
+
+The JD file may be a `.jsonl` file of {"id": ..., "text": ...} records, a
+directory of `.txt` files (one JD each), or a text file with JDs separated by
+lines containing only `---`.
+
+With `--stream` (implied for a `.zip` of resumes), resumes are extracted and
+scored in batches of `--batch-size` and only scores, keyword counts and the
+top-k stay in memory; text is spilled to a temporary file (see streaming.py).
+Streaming has no persistent TF-IDF index or deduplicating corpus, so it
+rejects `--tfidf-index` and `--corpus`.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from chunking import POOLING_METHODS
+from corpus_store import CorpusStore
+from embedding_store import EmbeddingStore
+from export import EXPORT_FORMATS, ExportWriter, export_format, ranking_chunks
+from instrumentation import instrumented
+from models import BACKENDS, REGISTRY
+from query import TermIndex, parse_query
+from skills import SkillIndex, SkillTaxonomy
+from streaming import STREAM_BATCH_SIZE, STREAM_METHODS, rank_stream
+from text_cache import TextCache
+from tfidf_index import TfidfIndex
+from tokens import TokenizedCorpus
+from ranker import (
+    CORPUS_DB,
+    EMBEDDING_CACHE_DIR,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_WORKERS,
+    SKILL_TAXONOMY_FILE,
+    TEXT_CACHE_DB,
+    TFIDF_INDEX_DIR,
+    Ranking,
+    deduplicate_resumes,
+    filter_by_query,
+    filter_by_skills,
+    list_resume_files,
+    load_model,
+    load_resume_texts,
+    rank_resumes_cascade,
+    rank_resumes_multi,
+)
+
+OUTPUT_FIELDS = ["jd_id", "rank", "resume", "score", "matched_keywords"]
+
+
+def load_job_descriptions(path):
+    """Return a list of (jd_id, text) pairs from a JD file or directory"""
+    if os.path.isdir(path):
+        jds = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    jds.append((os.path.splitext(name)[0], f.read()))
+        return jds
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            jds = []
+            for i, line in enumerate(f):
+                if line.strip():
+                    record = json.loads(line)
+                    jds.append((str(record.get("id", i)), record["text"]))
+            return jds
+        chunks = [chunk.strip() for chunk in f.read().split("\n---\n")]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    chunks = [chunk for chunk in chunks if chunk]
+    if len(chunks) == 1:
+        return [(stem, chunks[0])]
+    return [(f"{stem}-{i + 1}", chunk) for i, chunk in enumerate(chunks)]
+
+
+def iter_rankings(jds, resumes, method, top_k=None, model=None, store=None, tfidf_index=None,
+                  shortlist_size=50, bert_weight=0.7, pooling=None, min_score=None):
+    """Yield (jd_id, jd_text, ranked) for each JD from a single M x N scoring pass"""
+    if method == "cascade":
+        # Shortlists differ per JD; the embedding store shares resume encodings across them
+        for jd_id, jd_text in jds:
+            yield jd_id, jd_text, rank_resumes_cascade(jd_text, resumes, shortlist_size, bert_weight, model, store,
+                                                       tfidf_index, top_k, min_score)
+        return
+    _, rankings = rank_resumes_multi([text for _, text in jds], resumes, method,
+                                     top_k=top_k, model=model, store=store, tfidf_index=tfidf_index,
+                                     pooling=pooling, min_score=min_score)
+    for (jd_id, jd_text), ranked in zip(jds, rankings):
+        yield jd_id, jd_text, ranked
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Rank a directory of resumes against job descriptions.")
+    parser.add_argument("resume_dir", help="Directory of .pdf/.docx/.txt resumes, or a .zip of them")
+    parser.add_argument("jd_file", help=".jsonl file, directory of .txt files, or '---'-separated text file")
+    parser.add_argument("--method", choices=["bert", "tfidf", "cascade"], default="bert")
+    parser.add_argument("--shortlist-size", type=int, default=50,
+                        help="Cascade: TF-IDF candidates reranked with BERT per JD")
+    parser.add_argument("--bert-weight", type=float, default=0.7,
+                        help="Cascade: final score = w * BERT + (1 - w) * TF-IDF")
+    parser.add_argument("--chunk-pooling", choices=POOLING_METHODS,
+                        help="BERT: embed resumes in section/window chunks and pool chunk scores")
+    parser.add_argument("--output", "-o", help="Output path (default: stdout)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument("--top-k", type=int, help="Only write the top K resumes per JD")
+    parser.add_argument("--min-score", type=float, help="Only write resumes scoring at least this much")
+    parser.add_argument("--must-have", help="Comma-separated skills every resume must mention; "
+                                            "others are filtered out before scoring")
+    parser.add_argument("--skill-taxonomy", default=SKILL_TAXONOMY_FILE,
+                        help="JSON file of {skill: [aliases]} (default: the built-in taxonomy)")
+    parser.add_argument("--require", help='Requirement query resumes must satisfy before scoring, '
+                                          'e.g. \'python AND (aws OR gcp) AND "machine learning"\'')
+    parser.add_argument("--stream", action="store_true",
+                        help="Memory-bounded mode: score in batches, keep only scores and the top-k "
+                             "(always on for .zip input; bert/tfidf only, subfolders included)")
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE, help="Stream: resumes per batch")
+    parser.add_argument("--spill-dir", help="Stream: directory for the temporary text spill file")
+    parser.add_argument("--workers", type=int, default=EXTRACTION_WORKERS, help="Extraction worker processes")
+    parser.add_argument("--timeout", type=float, default=EXTRACTION_TIMEOUT, help="Per-file extraction timeout")
+    parser.add_argument("--embedding-cache", default=EMBEDDING_CACHE_DIR,
+                        help="Embedding store directory ('' to disable)")
+    parser.add_argument("--text-cache", default=TEXT_CACHE_DB, help="Extracted-text SQLite file ('' to disable)")
+    # None marks "not given", so --stream can reject them; main() fills in the defaults
+    parser.add_argument("--tfidf-index",
+                        help=f"Persistent TF-IDF index directory ('' to refit per run; default: {TFIDF_INDEX_DIR}; "
+                             "not with --stream)")
+    parser.add_argument("--corpus",
+                        help=f"Deduplicating corpus SQLite file ('' to rank duplicate resumes separately; "
+                             f"default: {CORPUS_DB}; not with --stream)")
+    add_encoder_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics", help="Write stage timings and counters here ('-' for stderr)")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"],
+                        help="Metrics format (default: prometheus for .prom files, else json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Include a cProfile summary and tracemalloc allocation sites in the metrics")
+
+
+def write_metrics(recorder, path, fmt=None):
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "json")
+    text = recorder.to_prometheus() if fmt == "prometheus" else recorder.to_json() + "\n"
+    if path == "-":
+        sys.stderr.write(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def run_instrumented(args, fn):
+    """Run fn(args) under a fresh recorder (and the profilers with --profile), then write --metrics"""
+    with instrumented(args.profile) as recorder:
+        status = fn(args)
+    if args.metrics:
+        write_metrics(recorder, args.metrics, args.metrics_format)
+    return status
+
+
+def add_encoder_arguments(parser):
+    parser.add_argument("--encoder-backend", choices=BACKENDS, default=REGISTRY.backend,
+                        help="Embedding model runtime: PyTorch fp32, int8-quantized PyTorch, ONNX or int8 ONNX")
+    parser.add_argument("--encoder-threads", type=int, default=REGISTRY.threads,
+                        help="Intra-op threads for the encoder (0: library default)")
+    parser.add_argument("--encode-batch-size", type=int, default=REGISTRY.batch_size,
+                        help="Texts per encoder batch")
+
+
+def configure_encoder(args):
+    REGISTRY.configure(args.encoder_backend, args.encoder_threads, args.encode_batch_size)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.stream = args.stream or args.resume_dir.endswith(".zip")
+    if args.stream and args.method not in STREAM_METHODS:
+        parser.error(f"--method {args.method} needs every resume in memory; streaming supports "
+                     f"{', '.join(STREAM_METHODS)}")
+    if args.stream and (args.tfidf_index or args.corpus):
+        parser.error("--tfidf-index and --corpus need every resume in memory and can't be used with --stream")
+    args.tfidf_index = TFIDF_INDEX_DIR if args.tfidf_index is None else args.tfidf_index
+    args.corpus = CORPUS_DB if args.corpus is None else args.corpus
+    args.taxonomy = SkillTaxonomy.load(args.skill_taxonomy)
+    try:
+        args.must_have = args.taxonomy.resolve(args.must_have.split(",")) if args.must_have else []
+        args.require = parse_query(args.require)
+    except ValueError as e:  # an unknown skill or a QuerySyntaxError
+        parser.error(str(e))
+    configure_encoder(args)
+    return run_instrumented(args, rank_streaming if args.stream else rank)
+
+
+def rank(args):
+    fmt = export_format(args.output, args.format)
+
+    def report_error(name, error):
+        print(f"Error processing {name}: {error}", file=sys.stderr)
+
+    resumes = load_resume_texts(
+        list_resume_files(args.resume_dir),
+        max_workers=args.workers,
+        timeout=args.timeout,
+        cache=TextCache(db_path=args.text_cache or None),
+        on_error=report_error,
+    )
+    if not resumes:
+        print("No valid resume files could be processed.", file=sys.stderr)
+        return 1
+    if args.corpus:
+        resumes, duplicates, near_duplicates = deduplicate_resumes(resumes, CorpusStore(args.corpus))
+        for name, original in duplicates.items():
+            print(f"Skipping {name}: duplicate of {original}", file=sys.stderr)
+        for name, original in near_duplicates.items():
+            print(f"Ranking {name} on its own text: near-duplicate of {original}", file=sys.stderr)
+    if args.must_have:
+        passing = filter_by_skills(resumes, args.must_have, SkillIndex(args.taxonomy))
+        print(f"Must-have skills filtered out {len(resumes) - len(passing)} of {len(resumes)} resume(s)",
+              file=sys.stderr)
+        resumes = passing
+    if args.require is not None:
+        passing = filter_by_query(resumes, args.require, TermIndex())
+        print(f"Requirement query ({args.require}) filtered out {len(resumes) - len(passing)} of "
+              f"{len(resumes)} resume(s)", file=sys.stderr)
+        resumes = passing
+    if not resumes:
+        print("No resume passes the must-have skills and requirement query.", file=sys.stderr)
+        return 1
+    jds = load_job_descriptions(args.jd_file)
+    print(f"Ranking {len(resumes)} resume(s) against {len(jds)} job description(s)", file=sys.stderr)
+
+    model = store = tfidf_index = None
+    if args.method in ("bert", "cascade"):
+        model = load_model()
+        store = EmbeddingStore(args.embedding_cache) if args.embedding_cache else None
+    if args.method in ("tfidf", "cascade") and args.tfidf_index:
+        tfidf_index = TfidfIndex.load(args.tfidf_index)
+
+    corpus = TokenizedCorpus(resumes)
+    position = {name: row for row, name in enumerate(corpus.names)}
+    with ExportWriter(args.output or sys.stdout.buffer, fmt, OUTPUT_FIELDS) as writer:
+        rankings = iter_rankings(jds, resumes, args.method, args.top_k, model, store, tfidf_index,
+                                 args.shortlist_size, args.bert_weight, args.chunk_pooling, args.min_score)
+        for jd_id, jd_text, ranked in rankings:
+            overlaps = corpus.keyword_overlap_counts(jd_text)
+            if ranked.names != corpus.names:  # cascade rankings cover the shortlist only
+                overlaps = overlaps[[position[name] for name in ranked.names]]
+            writer.write_all(ranking_chunks(ranked, overlaps=overlaps, constants={"jd_id": jd_id}))
+    if tfidf_index is not None:
+        tfidf_index.save(args.tfidf_index)
+    return 0
+
+
+def rank_streaming(args):
+    fmt = export_format(args.output, args.format)
+    jds = load_job_descriptions(args.jd_file)
+
+    def report_error(name, error):
+        print(f"Error processing {name}: {error}", file=sys.stderr)
+
+    def report_progress(done):
+        print(f"Scored {done} resume(s)", file=sys.stderr)
+
+    model = store = None
+    if args.method == "bert":
+        model = load_model()
+        store = EmbeddingStore(args.embedding_cache) if args.embedding_cache else None
+    with rank_stream([text for _, text in jds], args.resume_dir, args.method, top_k=args.top_k,
+                     batch_size=args.batch_size, model=model, store=store, spill_dir=args.spill_dir,
+                     max_workers=args.workers, timeout=args.timeout,
+                     cache=TextCache(db_path=args.text_cache or None), on_error=report_error,
+                     progress_callback=report_progress, must_have=args.must_have,
+                     taxonomy=args.taxonomy, query=args.require) as ranking:
+        if args.must_have or args.require is not None:
+            print(f"Must-have skills and the requirement query filtered out {ranking.filtered_out} resume(s)",
+                  file=sys.stderr)
+        if not len(ranking):
+            print("No valid resume files could be processed.", file=sys.stderr)
+            return 1
+        print(f"Ranked {len(ranking)} resume(s) against {len(jds)} job description(s)", file=sys.stderr)
+        with ExportWriter(args.output or sys.stdout.buffer, fmt, OUTPUT_FIELDS) as writer:
+            for jd, (jd_id, _) in enumerate(jds):
+                scores, overlaps = ranking.score_array(jd), ranking.overlap_array(jd)
+                if args.top_k is not None:
+                    # The bounded heap already holds the top-k; the full arrays are only read without --top-k
+                    rows = ranking.top_rows(jd)
+                    names, scores, overlaps = [ranking.names[row] for row in rows], scores[rows], overlaps[rows]
+                else:
+                    names = ranking.names
+                ranked = Ranking(names, scores, min_score=args.min_score)
+                writer.write_all(ranking_chunks(ranked, overlaps=overlaps, constants={"jd_id": jd_id}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
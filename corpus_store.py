@@ -0,0 +1,205 @@
+"""
+Persistent, deduplicated resume corpus for the Smart Resume Ranker.
+
+Every distinct resume gets one document ID in a SQLite file, stored with its
+text, its analyzed tokens (zlib-compressed) and a MinHash signature. Every
+(name, text) pair it was uploaded as is kept as an alias, so the same resume
+uploaded twice, under two file names or across sessions resolves to the same
+document and is only tokenized, indexed and encoded once:
+
+- exact copies: SHA-256 of the whitespace-normalized text
+- near-duplicates (a re-export or an updated copy): MinHash over word 3-gram
+  shingles, with LSH banding to find candidates; a candidate whose estimated
+  Jaccard similarity reaches `near_duplicate_threshold` is recorded as a
+  "near" alias of the existing document. Its text differs from the stored
+  one, so callers rank the uploaded text and only report the match
+
+TF-IDF rows and embeddings stay in their own stores (`TfidfIndex`, the
+memory-mapped `EmbeddingStore`), which are keyed by content too; attach them
+to look a document's row or vector up by its ID.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from embedding_store import make_key, normalize_text
+from tfidf_index import text_id
+from tokens import analyze, token_stream
+
+NUM_PERM = 128
+LSH_BANDS = 16   # 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+SHINGLE_SIZE = 3
+_PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(0x5EED)  # fixed so signatures stay comparable across runs
+_PERM_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    tokens BLOB NOT NULL,
+    minhash BLOB NOT NULL,
+    added REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    PRIMARY KEY (name, content_hash)
+);
+CREATE INDEX IF NOT EXISTS aliases_by_hash ON aliases (content_hash);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lsh_lookup ON lsh_buckets (band, bucket);
+"""
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text, tokens=None):
+    """NUM_PERM minimum hashes of the text's word shingles (uint32); `tokens` is its token stream if known"""
+    words = token_stream(text) if tokens is None else tokens
+    if len(words) >= SHINGLE_SIZE:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = set(words) or {""}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    hashes %= _PRIME
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def _band_buckets(signature):
+    rows = NUM_PERM // LSH_BANDS
+    return [int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(),
+                                           digest_size=8).digest(), "big", signed=True)
+            for band in range(LSH_BANDS)]
+
+
+class CorpusStore:
+    """Deduplicated resumes in SQLite; `add` resolves each upload to a document ID"""
+
+    def __init__(self, db_path, near_duplicate_threshold=0.9, tfidf_index=None, embeddings=None):
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.tfidf_index = tfidf_index
+        self.embeddings = embeddings
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    # ----------- Adding -----------
+    def _near_duplicate(self, signature):
+        """(doc_id, similarity) of the closest stored document above the threshold, or (None, 0.0)"""
+        candidates = set()
+        for band, bucket in enumerate(_band_buckets(signature)):
+            candidates.update(row[0] for row in self.db.execute(
+                "SELECT doc_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        best, best_similarity = None, 0.0
+        for doc_id in candidates:
+            stored = np.frombuffer(self.db.execute("SELECT minhash FROM documents WHERE doc_id = ?",
+                                                   (doc_id,)).fetchone()[0], dtype=np.uint32)
+            similarity = float(np.mean(stored == signature))
+            if similarity > best_similarity:
+                best, best_similarity = doc_id, similarity
+        if best_similarity >= self.near_duplicate_threshold:
+            return best, best_similarity
+        return None, 0.0
+
+    def _add(self, name, text):
+        digest = content_hash(text)
+        row = self.db.execute("SELECT doc_id, kind, similarity FROM aliases WHERE content_hash = ? LIMIT 1",
+                              (digest,)).fetchone()
+        if row is not None:
+            # Same text as an earlier upload: an exact copy of the document, or of a near-duplicate of it
+            doc_id, kind, similarity = (row[0], "near", row[2]) if row[1] == "near" else (row[0], "exact", 1.0)
+        else:
+            words = token_stream(text)
+            signature = minhash_signature(text, words)
+            doc_id, similarity = self._near_duplicate(signature)
+            kind = "near"
+            if doc_id is None:
+                tokens = zlib.compress(" ".join(analyze(text, words)).encode("utf-8"))
+                doc_id = self.db.execute(
+                    "INSERT INTO documents (name, content_hash, text, tokens, minhash, added) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, digest, text, tokens, signature.tobytes(), time.time())).lastrowid
+                self.db.executemany("INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                                    [(band, bucket, doc_id) for band, bucket in enumerate(_band_buckets(signature))])
+                kind, similarity = "new", 1.0
+        self.db.execute("INSERT OR IGNORE INTO aliases (name, content_hash, doc_id, kind, similarity) "
+                        "VALUES (?, ?, ?, ?, ?)", (name, digest, doc_id, kind, similarity))
+        return doc_id, kind, similarity
+
+    def add(self, name, text):
+        """Add one resume; returns (doc_id, kind, similarity) with kind "new", "exact" or "near" """
+        return self.add_many([(name, text)])[0]
+
+    def add_many(self, items):
+        """Add (name, text) pairs in one transaction; returns (doc_id, kind, similarity) for each"""
+        items = list(items)
+        with self._lock:
+            results = [self._add(name, text) for name, text in items]
+            self.db.commit()
+        if self.tfidf_index is not None:
+            self.tfidf_index.ensure([text for (_, text), (_, kind, _) in zip(items, results) if kind == "new"])
+        return results
+
+    # ----------- Lookup -----------
+    def _document(self, doc_id, column):
+        with self._lock:
+            row = self.db.execute(f"SELECT {column} FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            raise KeyError(doc_id)
+        return row[0]
+
+    def text(self, doc_id):
+        return self._document(doc_id, "text")
+
+    def name(self, doc_id):
+        """The name the document was first added under"""
+        return self._document(doc_id, "name")
+
+    def tokens(self, doc_id):
+        """The document's analyzed tokens (stop words removed), in order"""
+        return zlib.decompress(self._document(doc_id, "tokens")).decode("utf-8").split()
+
+    def aliases(self, doc_id):
+        """(name, kind, similarity) for every upload that resolved to this document"""
+        with self._lock:
+            return self.db.execute("SELECT name, kind, similarity FROM aliases WHERE doc_id = ? ORDER BY rowid",
+                                   (doc_id,)).fetchall()
+
+    def tfidf_row(self, doc_id):
+        """The document's L2-normalized TF-IDF row from the attached `TfidfIndex`, or None"""
+        if self.tfidf_index is None:
+            return None
+        key = text_id(self.text(doc_id))
+        return self.tfidf_index.row(key) if key in self.tfidf_index else None
+
+    def embedding(self, doc_id, model_name):
+        """The document's cached embedding for `model_name` from the attached `EmbeddingStore`, or None"""
+        if self.embeddings is None:
+            return None
+        key = make_key(model_name, self.text(doc_id))
+        return self.embeddings.get([key]).get(key)
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
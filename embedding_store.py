@@ -0,0 +1,192 @@
+"""
+Persistent embedding store for the Smart Resume Ranker.
+
+Embeddings are content-addressed by a hash of (model name, normalized text) and
+kept in a memory-mapped float32 matrix next to a small JSON index, so resumes
+and job descriptions that were already encoded skip the transformer entirely.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.json"
+
+
+def normalize_text(text):
+    """Collapse whitespace; the tokenizer ignores it, so embeddings are unchanged"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(model_name, text):
+    """Content hash used as the cache key for one (model, text) pair"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingStore:
+    """Memory-mapped float32 embedding matrix with LRU eviction.
+
+    Each entry owns one row ("slot") of the matrix. The index maps keys to
+    their slot and last-use tick; when the store is full the least recently
+    used rows are recycled. `max_entries` and `max_bytes` both bound the size
+    of the matrix file.
+    """
+
+    def __init__(self, path, max_entries=100_000, max_bytes=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dim = None
+        self.capacity = 0
+        self.tick = 0
+        self.entries = {}  # key -> [slot, last_used]
+        self.free_slots = []
+        self.vectors = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ----------- Persistence -----------
+    def _index_path(self):
+        return os.path.join(self.path, INDEX_FILE)
+
+    def _vectors_path(self):
+        return os.path.join(self.path, VECTORS_FILE)
+
+    def _load(self):
+        if not os.path.exists(self._index_path()):
+            return
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self.capacity = index["capacity"]
+            self.tick = index["tick"]
+            self.entries = index["entries"]
+            self.vectors = np.memmap(self._vectors_path(), dtype=np.float32, mode="r+",
+                                     shape=(self.capacity, self.dim))
+        except (OSError, ValueError, KeyError):
+            # A corrupt or half-written store is only a cache: start over.
+            self.dim, self.capacity, self.tick, self.entries, self.vectors = None, 0, 0, {}, None
+            return
+        used = {slot for slot, _ in self.entries.values()}
+        self.free_slots = [s for s in range(self.capacity - 1, -1, -1) if s not in used]
+
+    def flush(self):
+        """Write the matrix and index to disk"""
+        with self._lock:
+            if self.vectors is None:
+                return
+            self.vectors.flush()
+            index = {"dim": self.dim, "capacity": self.capacity, "tick": self.tick,
+                     "entries": self.entries}
+            tmp_path = self._index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path())
+
+    # ----------- Capacity & Eviction -----------
+    def _limit(self):
+        limit = self.max_entries
+        if self.max_bytes is not None and self.dim:
+            limit = min(limit, self.max_bytes // (self.dim * 4))
+        return max(int(limit), 1)
+
+    def _grow(self, needed):
+        limit = self._limit()
+        new_capacity = min(max(self.capacity * 2, needed, 1024), limit)
+        if new_capacity <= self.capacity:
+            return
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self._vectors_path(), "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self.vectors = np.memmap(self._vectors_path(), dtype=np.float32, mode="r+",
+                                 shape=(new_capacity, self.dim))
+        self.free_slots.extend(range(new_capacity - 1, self.capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def _evict(self, count, protected):
+        candidates = sorted((last_used, key) for key, (_, last_used) in self.entries.items()
+                            if key not in protected)
+        for _, key in candidates[:count]:
+            slot, _ = self.entries.pop(key)
+            self.free_slots.append(slot)
+
+    def _allocate(self, count, protected):
+        if len(self.free_slots) < count:
+            self._grow(len(self.entries) + count)
+        if len(self.free_slots) < count:
+            self._evict(count - len(self.free_slots), protected)
+        return [self.free_slots.pop() for _ in range(min(count, len(self.free_slots)))]
+
+    # ----------- Lookup -----------
+    def get(self, keys):
+        """Return {key: vector} for the keys that are cached"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                self.tick += 1
+                entry[1] = self.tick
+                found[key] = np.array(self.vectors[entry[0]])
+        return found
+
+    def put(self, keys, vectors):
+        """Store one row per key, evicting least recently used rows if full"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store ({self.dim})")
+            new_keys = [k for k in dict.fromkeys(keys) if k not in self.entries]
+            slots = dict(zip(new_keys, self._allocate(len(new_keys), set(keys))))
+            for key, vector in zip(keys, vectors):
+                entry = self.entries.get(key)
+                if entry is None:
+                    if key not in slots:
+                        continue  # store is smaller than this batch
+                    entry = self.entries[key] = [slots[key], 0]
+                self.tick += 1
+                entry[1] = self.tick
+                self.vectors[entry[0]] = vector
+
+    def encode(self, model, model_name, texts, batch_size=32):
+        """Encode texts with `model`, running only uncached texts through it"""
+        texts = [normalize_text(t) for t in texts]
+        keys = [make_key(model_name, t) for t in texts]
+        cached = self.get(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            new_vectors = model.encode(list(missing.values()), batch_size=batch_size,
+                                       convert_to_numpy=True)
+            new_vectors = np.asarray(new_vectors, dtype=np.float32)
+            self.put(list(missing), new_vectors)
+            self.flush()
+            cached.update(zip(missing, new_vectors))
+        if not keys:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.stack([cached[k] for k in keys])
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,195 @@
+"""
+Ranking export for the Smart Resume Ranker.
+
+Reports are built as columns straight from what ranking already computed (a
+`Ranking`'s score array, the keyword overlap counts or matched keyword lists)
+and written a chunk of rows at a time, so a 100k-row report never exists as a
+list of row dicts, a DataFrame and a CSV string at once:
+
+    with ExportWriter("rankings.parquet", "parquet") as writer:
+        writer.write_all(ranking_chunks(ranked, overlaps=counts, constants={"jd_id": "jd-1"}))
+
+Formats are csv, csv.gz, jsonl and parquet (needs pyarrow). `export_file`
+spools a report into a temporary file that moves to disk past
+EXPORT_SPOOL_BYTES, ready for a download button.
+"""
+
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from instrumentation import count, span
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("RESUME_RANKER_EXPORT_CHUNK_ROWS", 10_000))
+EXPORT_SPOOL_BYTES = 32 * 2**20
+EXPORT_FORMATS = ("csv", "csv.gz", "jsonl", "parquet")
+MIME_TYPES = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+REPORT_FIELDS = ["Resume", "Match Score", "Match Percentage", "Matched Keywords", "Keyword List"]
+
+
+def available_formats():
+    """Export formats usable here; parquet only when pyarrow is installed"""
+    return tuple(fmt for fmt in EXPORT_FORMATS
+                 if fmt != "parquet" or importlib.util.find_spec("pyarrow") is not None)
+
+
+def export_format(path, fmt=None, default="csv"):
+    """`fmt` if given, else the format implied by the path's extension"""
+    if fmt:
+        return fmt
+    for candidate in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if (path or "").endswith("." + candidate):
+            return candidate
+    return default
+
+
+# ----------- Columns -----------
+def ranking_chunks(ranked, overlaps=None, keywords=None, keyword_limit=10, decimals=4,
+                   chunk_rows=EXPORT_CHUNK_ROWS, constants=None):
+    """Yield a `Ranking` as column dicts of up to `chunk_rows` rows, best first
+
+    Columns are rank, resume and score, plus matched_keywords from `overlaps`
+    (counts aligned with `ranked.names`) and keyword_list from `keywords`
+    ({name: [matched words]}) when given. `constants` adds columns repeating
+    one value, e.g. {"jd_id": ...}.
+    """
+    order = ranked.indices
+    names = ranked.names
+    overlaps = None if overlaps is None else np.asarray(overlaps)
+    for start in range(0, len(order), chunk_rows):
+        rows = order[start:start + chunk_rows]
+        chunk = {key: [value] * len(rows) for key, value in (constants or {}).items()}
+        chunk["rank"] = np.arange(start + 1, start + len(rows) + 1)
+        chunk["resume"] = [names[row] for row in rows]
+        scores = ranked.all_scores[rows].astype(np.float64)
+        chunk["score"] = scores if decimals is None else scores.round(decimals)
+        if overlaps is not None:
+            chunk["matched_keywords"] = overlaps[rows]
+        if keywords is not None:
+            chunk["keyword_list"] = [", ".join(keywords[name][:keyword_limit]) for name in chunk["resume"]]
+        yield chunk
+
+
+def report_chunks(ranked, keywords, chunk_rows=EXPORT_CHUNK_ROWS):
+    """The app's detailed report (REPORT_FIELDS) for a `Ranking` and {name: [matched words]}"""
+    for chunk in ranking_chunks(ranked, keywords=keywords, decimals=None, chunk_rows=chunk_rows):
+        scores = chunk["score"]
+        yield {
+            "Resume": chunk["resume"],
+            "Match Score": scores.round(3),
+            "Match Percentage": np.char.mod("%.1f%%", scores * 100),
+            "Matched Keywords": np.fromiter((len(keywords[name]) for name in chunk["resume"]),
+                                            dtype=np.int64, count=len(scores)),
+            "Keyword List": chunk["keyword_list"],
+        }
+
+
+# ----------- Writers -----------
+class ExportWriter:
+    """Writes column chunks as CSV, gzip CSV, JSONL or Parquet to a path or binary stream
+
+    `fields` picks and orders the columns (default: the first chunk's keys).
+    A stream passed in is flushed but left open on close.
+    """
+
+    def __init__(self, dest, fmt="csv", fields=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+        self.fmt = fmt
+        self.fields = list(fields) if fields else None
+        self.rows = 0
+        # Fail before the destination is created (and not after ranking) when pyarrow is missing
+        if fmt == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise ModuleNotFoundError("Parquet export needs pyarrow (pip install pyarrow)", name="pyarrow")
+        self._owned = isinstance(dest, (str, os.PathLike))
+        self.raw = open(dest, "wb") if self._owned else dest
+        self._gzip = self._text = self._csv = self._parquet = None
+        if fmt == "parquet":
+            return
+        if fmt == "csv.gz":
+            self._gzip = gzip.GzipFile(fileobj=self.raw, mode="wb", compresslevel=6, mtime=0)
+        self._text = io.TextIOWrapper(self._gzip or self.raw, encoding="utf-8", newline="")
+        if fmt != "jsonl":
+            self._csv = csv.writer(self._text)
+            if self.fields:
+                self._csv.writerow(self.fields)
+
+    def write(self, chunk):
+        """Write one dict of equal-length columns"""
+        if self.fields is None:
+            self.fields = list(chunk)
+            if self._csv is not None:
+                self._csv.writerow(self.fields)
+        with span("export"):
+            if self.fmt == "parquet":
+                written = self._write_parquet(chunk)
+            else:
+                columns = [_as_list(chunk[field]) for field in self.fields]
+                written = len(columns[0]) if columns else 0
+                if self._csv is not None:
+                    self._csv.writerows(zip(*columns))
+                else:
+                    self._text.write("".join(json.dumps(dict(zip(self.fields, row))) + "\n"
+                                             for row in zip(*columns)))
+                self._text.flush()
+            self.rows += written
+            count("export.rows", written)
+
+    def write_all(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+
+    def _write_parquet(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({field: chunk[field] for field in self.fields})
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(pa.PythonFile(self.raw, mode="w"), table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+        return table.num_rows
+
+    def close(self):
+        if self.fmt == "parquet":
+            if self._parquet is None and self.fields:
+                self.write({field: [] for field in self.fields})
+            if self._parquet is not None:
+                self._parquet.close()
+        else:
+            self._text.flush()
+            self._text.detach()
+            if self._gzip is not None:
+                self._gzip.close()
+        if self._owned:
+            self.raw.close()
+        else:
+            self.raw.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _as_list(column):
+    return column.tolist() if isinstance(column, np.ndarray) else column
+
+
+def export_file(chunks, fmt="csv", fields=None, spool_bytes=EXPORT_SPOOL_BYTES):
+    """A report written into a rewound temporary file, in memory up to `spool_bytes` and on disk past it"""
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+    with ExportWriter(spool, fmt, fields) as writer:
+        writer.write_all(chunks)
+    spool.seek(0)
+    return spool
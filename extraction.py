@@ -0,0 +1,357 @@
+"""
+Resume text extraction for the Smart Resume Ranker.
+
+Files are passed around as (name, bytes) pairs so extraction can run in a pool
+of worker processes; results always come back in the original upload order.
+
+PDFs are read through pdfium's text layer first, which is far faster than
+pdfplumber's layout analysis; only pages where that yields almost no text are
+re-read with pdfplumber. Pages past RESUME_RANKER_PDF_MAX_PAGES are skipped,
+and long PDFs are split into page ranges that run on separate workers.
+"""
+
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import docx2txt
+import pdfplumber
+import pypdfium2 as pdfium
+
+from instrumentation import add_span, count
+from text_cache import file_digest
+
+SUPPORTED_EXTENSIONS = (".docx", ".pdf", ".txt")
+PDF_MAX_PAGES = int(os.environ.get("RESUME_RANKER_PDF_MAX_PAGES", 50))
+PDF_PAGES_PER_TASK = int(os.environ.get("RESUME_RANKER_PDF_PAGES_PER_TASK", 8))
+MIN_PAGE_CHARS = 20  # pages with less text from pdfium are retried with pdfplumber
+# Bump when extraction output changes, so text cached by an older extractor is not served
+EXTRACTOR_VERSION = 2
+# How often the parent checks its deadline on tasks running in workers
+DEADLINE_POLL_SECONDS = 0.5
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+# ----------- Extractors -----------
+def extract_docx_text(file):
+    return docx2txt.process(file)
+
+
+def pdf_page_count(data):
+    pdf = pdfium.PdfDocument(data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _pdfium_pages(data, start, stop):
+    pdf = pdfium.PdfDocument(data)
+    try:
+        pages = []
+        for i in range(start, min(stop, len(pdf))):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return pages, len(pdf)
+    finally:
+        pdf.close()
+
+
+def extract_pdf_pages(data, start=0, stop=None, stats=None):
+    """Text of pages [start, stop), pdfium first and pdfplumber for pages where it finds almost nothing"""
+    stop = PDF_MAX_PAGES if stop is None else stop
+    try:
+        pages, total = _pdfium_pages(data, start, stop)
+        retry = [i for i, text in enumerate(pages) if len(text.strip()) < MIN_PAGE_CHARS]
+    except pdfium.PdfiumError:
+        pages, total, retry = None, 0, None  # pdfium rejects some damaged files pdfminer can still read
+    if retry is None or retry:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            if pages is None:
+                total = len(pdf.pages)
+                pages = [""] * max(min(stop, total) - start, 0)
+                retry = range(len(pages))
+            for i in retry:
+                pages[i] = pdf.pages[start + i].extract_text() or pages[i]
+    if stats is not None:
+        stats["pages"] = stats.get("pages", 0) + len(pages)
+        stats["fallback_pages"] = stats.get("fallback_pages", 0) + len(retry)
+        if stop >= PDF_MAX_PAGES:  # the range that ends at the cap counts what it cut off
+            stats["pages_skipped"] = max(total - stop, 0)
+    return "\n".join(pages)
+
+
+def extract_pdf_text(file, stats=None):
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            data = f.read()
+    else:
+        data = file if isinstance(file, bytes) else file.read()
+    return extract_pdf_pages(data, 0, PDF_MAX_PAGES, stats)
+
+
+def _page_ranges(name, data):
+    """Split a long PDF into (start, stop) page ranges of PDF_PAGES_PER_TASK, else [None]"""
+    if not name.endswith(".pdf"):
+        return [None]
+    try:
+        pages = min(pdf_page_count(data), PDF_MAX_PAGES)
+    except pdfium.PdfiumError:
+        return [None]
+    if pages <= PDF_PAGES_PER_TASK:
+        return [None]
+    return [(start, min(start + PDF_PAGES_PER_TASK, pages)) for start in range(0, pages, PDF_PAGES_PER_TASK)]
+
+
+def extract_text(name, data, stats=None, pages=None):
+    """Extract text from one file's bytes, dispatching on the extension.
+
+    `stats` collects page counts; `pages` is a (start, stop) range for PDFs.
+    """
+    if name.endswith(".docx"):
+        return extract_docx_text(io.BytesIO(data))
+    if name.endswith(".pdf"):
+        start, stop = pages or (0, PDF_MAX_PAGES)
+        return extract_pdf_pages(data, start, stop, stats)
+    if name.endswith(".txt"):
+        return data.decode("utf-8", errors="replace")
+    return ""
+
+
+def text_cache_key(data):
+    """TextCache key for a file: its bytes' digest plus the extractor version and page cap that produced the text"""
+    return f"{file_digest(data)}:v{EXTRACTOR_VERSION}:p{PDF_MAX_PAGES}"
+
+
+# ----------- Worker Pool -----------
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _alarm_available():
+    """Whether SIGALRM can time out extraction in this thread (only the main thread receives signals)"""
+    return hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+
+
+def _extract_one(name, data, timeout, pages=None):
+    """Worker entry point; returns (text, error message, stats)"""
+    use_alarm = timeout and _alarm_available()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    stats = {"pages": 0}
+    start = time.perf_counter()
+    try:
+        return extract_text(name, data, stats, pages), None, stats
+    except ExtractionTimeout:
+        return "", f"extraction timed out after {timeout:g}s", stats
+    except Exception as e:
+        return "", str(e), stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+class ExtractionPool:
+    """Extraction worker processes, started on first use and restarted when a worker hangs or dies"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+
+    def submit(self, fn, *args):
+        if self._executor is None:
+            # spawn keeps workers clear of the parent's torch/Streamlit threads
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor.submit(fn, *args)
+
+    def restart(self):
+        """Kill the workers without waiting on them; the next `submit` starts fresh ones"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor has no public way to stop a worker stuck in native code
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        count("extraction.pool_restarts")
+
+    def shutdown(self, wait=True):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def extraction_pool(max_workers=None):
+    """A worker pool that several `iter_extract_texts` calls can share"""
+    return ExtractionPool(max_workers)
+
+
+def iter_extract_texts(documents, max_workers=None, timeout=60, cache=None, pool=None):
+    """Extract (name, bytes) documents in parallel, yielding as they finish.
+
+    Yields (position, name, text, error) tuples; cached files come first,
+    then files in completion order. `timeout` is enforced per file inside the
+    worker (per page range for long PDFs, which are split across workers),
+    and by the parent, which restarts the pool if a worker stays stuck in
+    native code. Off the main thread, where SIGALRM can't fire, even a single
+    file goes through a worker so the timeout still holds. With a
+    `TextCache`, files whose bytes were extracted before are served from it
+    and skip the pool. Callers extracting many batches can pass an
+    `extraction_pool()` so workers are started once.
+    """
+    documents = list(documents)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    digests = [text_cache_key(data) for _, data in documents] if cache is not None else None
+    pending = []
+    for i, (name, data) in enumerate(documents):
+        text = cache.get(digests[i]) if cache is not None else None
+        if text is None:
+            pending.append(i)
+        else:
+            count("extraction.cache_hits")
+            yield i, name, text, None
+
+    def finish(i, text, error, stats=None):
+        name, data = documents[i]
+        # Timed inside the worker, so the span excludes queueing and pickling
+        add_span("extract" + os.path.splitext(name)[1], (stats or {}).get("seconds", 0.0))
+        count("extraction.docs")
+        count("extraction.bytes", len(data))
+        count("extraction.pages", (stats or {}).get("pages", 0))
+        count("extraction.fallback_pages", (stats or {}).get("fallback_pages", 0))
+        count("extraction.pages_skipped", (stats or {}).get("pages_skipped", 0))
+        if error is not None:
+            count("extraction.errors")
+        elif cache is not None:
+            cache.put(digests[i], text)
+        return i, name, text, error
+
+    # Split long PDFs first: one large upload is the case that gains most from spreading its pages over workers
+    tasks = [(i, part, pages) for i in pending
+             for part, pages in enumerate(_page_ranges(*documents[i]))]
+    if not tasks:
+        return
+    # In-process extraction can only enforce the timeout from the main thread (Streamlit runs scripts in another)
+    in_process = not timeout or _alarm_available()
+    if pool is None and in_process and (max_workers <= 1 or len(tasks) <= 1):
+        for i in pending:
+            name, data = documents[i]
+            yield finish(i, *_extract_one(name, data, timeout))
+        return
+
+    if pool is None:
+        with extraction_pool(min(max_workers, len(tasks))) as pool:
+            for result in _run_tasks(pool, documents, tasks, timeout):
+                yield finish(*result)
+    else:
+        for result in _run_tasks(pool, documents, tasks, timeout):
+            yield finish(*result)
+
+
+def _run_tasks(pool, documents, tasks, timeout):
+    """Submit (position, part, page range) tasks; yield (position, text, error, stats) per document
+
+    A task counts as started once the pool hands it to a worker's call queue,
+    which runs one task ahead of the workers, so the parent allows twice the
+    worker's `timeout` (plus a little for pickling) before it gives up on a
+    task, reports it as timed out and restarts the pool. Tasks lost with the
+    restarted pool are submitted again.
+    """
+    deadline = 2 * timeout + 5 if timeout else None
+    parts, remaining = {}, {}
+    for i, _, _ in tasks:
+        remaining[i] = remaining.get(i, 0) + 1
+
+    def record(task, text, error, stats):
+        i, part, _ = task
+        parts.setdefault(i, []).append((part, text, error, stats or {}))
+        remaining[i] -= 1
+        return (i, *_join_parts(parts.pop(i))) if not remaining[i] else None
+
+    queue, broken = list(tasks), False
+    while queue:
+        futures = {pool.submit(_extract_one, *documents[i], timeout, pages): (i, part, pages)
+                   for i, part, pages in queue}
+        queue, pending, started = [], set(futures), {}
+        while pending:
+            done, pending = wait(pending, timeout=DEADLINE_POLL_SECONDS if deadline else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    result, broken = ("", f"extraction worker crashed: {e}", None), True
+                finished = record(futures[future], *result)
+                if finished is not None:
+                    yield finished
+            if deadline is None:
+                continue
+            now = time.monotonic()
+            for future in pending:
+                if future.running():
+                    started.setdefault(future, now)
+            stuck = {future for future in pending if now - started.get(future, now) > deadline}
+            if stuck:
+                # The stuck worker never returns; give up on its task and replace the whole pool
+                for future in stuck:
+                    finished = record(futures[future], "", f"extraction timed out after {timeout:g}s", None)
+                    if finished is not None:
+                        yield finished
+                pool.restart()
+                queue = [futures[future] for future in pending - stuck]
+                break
+    if broken:
+        pool.restart()  # a crashed worker leaves the executor unusable for the next call
+
+
+def _join_parts(parts):
+    """Reassemble one document's page ranges in order into (text, error, stats)"""
+    parts.sort(key=lambda part: part[0])
+    errors = [error for _, _, error, _ in parts if error is not None]
+    stats = {}
+    for *_, part_stats in parts:
+        for key, value in part_stats.items():
+            stats[key] = stats.get(key, 0) + value
+    if errors:
+        return "", errors[0], stats
+    return "\n".join(text for _, text, _, _ in parts), None, stats
+
+
+def extract_texts(documents, max_workers=None, timeout=60, progress_callback=None, cache=None, pool=None):
+    """Extract (name, bytes) documents in parallel.
+
+    Returns a list of (name, text, error) in input order;
+    `progress_callback(done, total)` is called from the calling thread as
+    files finish. See `iter_extract_texts` for the other arguments.
+    """
+    documents = list(documents)
+    results = [None] * len(documents)
+    for done, (i, name, text, error) in enumerate(
+            iter_extract_texts(documents, max_workers, timeout, cache, pool), 1):
+        results[i] = (name, text, error)
+        if progress_callback:
+            progress_callback(done, len(documents))
+    return results
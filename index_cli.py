@@ -0,0 +1,114 @@
+"""
+Build and query persistent BERT vector indexes for the Smart Resume Ranker.
+
+    python index_cli.py build resumes/ --backend ivf --n-lists 256
+    python index_cli.py query jds.jsonl --top-k 20 --n-probe 16
+
+The index directory defaults to .cache/vector_index (RESUME_RANKER_VECTOR_INDEX),
+which is also where the Streamlit app looks for it. `build` adds any resumes not
+already in the index and re-encodes those whose text changed under the same file
+name (creating the index if needed); `query` streams the top-k resumes per job
+description as CSV, gzip CSV, JSONL or Parquet.
+"""
+
+import argparse
+import os
+import sys
+
+from cli import add_encoder_arguments, add_metrics_arguments, configure_encoder, load_job_descriptions, run_instrumented
+from embedding_store import EmbeddingStore
+from export import EXPORT_FORMATS, ExportWriter, export_format, ranking_chunks
+from text_cache import TextCache
+from vector_index import BACKENDS, META_FILE, create_index, load_index, save_index
+from ranker import (
+    EMBEDDING_CACHE_DIR,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_WORKERS,
+    TEXT_CACHE_DB,
+    VECTOR_INDEX_DIR,
+    Ranking,
+    add_to_vector_index,
+    list_resume_files,
+    load_model,
+    load_resume_texts,
+    search_vector_index,
+)
+
+QUERY_FIELDS = ["jd_id", "rank", "resume", "score"]
+
+
+def build(args):
+    def report_error(name, error):
+        print(f"Error processing {name}: {error}", file=sys.stderr)
+
+    resumes = load_resume_texts(
+        list_resume_files(args.resume_dir),
+        max_workers=args.workers,
+        timeout=args.timeout,
+        cache=TextCache(db_path=args.text_cache or None),
+        on_error=report_error,
+    )
+    if os.path.exists(os.path.join(args.index_dir, META_FILE)):
+        index = load_index(args.index_dir, mmap=False)
+    else:
+        params = {"n_lists": args.n_lists, "n_probe": args.n_probe} if args.backend == "ivf" else {}
+        index = create_index(args.backend, **params)
+    store = EmbeddingStore(args.embedding_cache) if args.embedding_cache else None
+    added, updated = add_to_vector_index(index, resumes, load_model(), store)
+    save_index(index, args.index_dir)
+    print(f"Added {added} and re-encoded {updated} changed resume(s); index holds {len(index)}", file=sys.stderr)
+    return 0
+
+
+def query(args):
+    index = load_index(args.index_dir)
+    jds = load_job_descriptions(args.jd_file)
+    store = EmbeddingStore(args.embedding_cache) if args.embedding_cache else None
+    search_params = {"n_probe": args.n_probe} if args.n_probe and index.kind == "ivf" else {}
+    results = search_vector_index([text for _, text in jds], index, args.top_k, load_model(), store,
+                                  **search_params)
+    with ExportWriter(args.output or sys.stdout.buffer, export_format(args.output, args.format), QUERY_FIELDS) as writer:
+        for (jd_id, _), ranked in zip(jds, results):
+            ranked = Ranking([name for name, _ in ranked], [score for _, score in ranked])
+            writer.write_all(ranking_chunks(ranked, constants={"jd_id": jd_id}))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build and query BERT vector indexes of resumes.")
+    parser.add_argument("--embedding-cache", default=EMBEDDING_CACHE_DIR,
+                        help="Embedding store directory ('' to disable)")
+    add_encoder_arguments(parser)
+    add_metrics_arguments(parser)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="Add a directory of resumes to an index")
+    build_cmd.add_argument("resume_dir")
+    build_cmd.add_argument("--index-dir", default=VECTOR_INDEX_DIR)
+    build_cmd.add_argument("--backend", choices=sorted(BACKENDS), default="exact")
+    build_cmd.add_argument("--n-lists", type=int, help="IVF cells (default: sqrt of the resume count)")
+    build_cmd.add_argument("--n-probe", type=int, default=8, help="IVF cells scanned per query by default")
+    build_cmd.add_argument("--workers", type=int, default=EXTRACTION_WORKERS, help="Extraction worker processes")
+    build_cmd.add_argument("--timeout", type=float, default=EXTRACTION_TIMEOUT, help="Per-file extraction timeout")
+    build_cmd.add_argument("--text-cache", default=TEXT_CACHE_DB, help="Extracted-text SQLite file ('' to disable)")
+    build_cmd.set_defaults(func=build)
+
+    query_cmd = commands.add_parser("query", help="Top-k resumes per job description")
+    query_cmd.add_argument("jd_file", help=".jsonl file, directory of .txt files, or '---'-separated text file")
+    query_cmd.add_argument("--index-dir", default=VECTOR_INDEX_DIR)
+    query_cmd.add_argument("--top-k", type=int, default=10)
+    query_cmd.add_argument("--n-probe", type=int, help="IVF cells to scan (higher = better recall)")
+    query_cmd.add_argument("--output", "-o", help="Output path (default: stdout)")
+    query_cmd.add_argument("--format", choices=EXPORT_FORMATS)
+    query_cmd.set_defaults(func=query)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_encoder(args)
+    return run_instrumented(args, args.func)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
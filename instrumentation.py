@@ -0,0 +1,179 @@
+"""
+Lightweight timing instrumentation for the Smart Resume Ranker.
+
+Code is wrapped in named spans and bumps named counters:
+
+    with span("rank.tfidf"):
+        count("docs", len(resumes))
+        ...
+
+Both go to the current `Recorder`: a process-wide default unless a caller
+activates its own with `recording()` (the app does so per analysis run, so
+concurrent sessions don't mix). Work done in extraction worker processes is
+timed there and reported back with `add_span`.
+
+`profiling()` optionally wraps a run in cProfile and/or tracemalloc and stores
+the top entries on the recorder; `instrumented()` combines a fresh recorder
+with optional profiling for one run. A recorder renders as a dict (`snapshot`),
+JSON or Prometheus text exposition format.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class Recorder:
+    """Span timings and counters for one run (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}     # name -> [calls, total seconds, max seconds]
+        self.counters = {}  # name -> value
+        self.profile = None
+        self.memory = None
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name, seconds):
+        """Record a duration measured elsewhere (e.g. in a worker process)"""
+        with self._lock:
+            stats = self.spans.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = {
+                "spans": {name: {"calls": calls, "total_seconds": round(total, 6),
+                                 "mean_ms": round(total / calls * 1000, 3), "max_ms": round(peak * 1000, 3)}
+                          for name, (calls, total, peak) in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+        if self.profile is not None:
+            snapshot["profile"] = self.profile
+        if self.memory is not None:
+            snapshot["memory"] = self.memory
+        return snapshot
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="resume_ranker"):
+        """Prometheus text exposition format: one summary per span, one counter per counter"""
+        lines = [f"# TYPE {prefix}_span_seconds summary"]
+        with self._lock:
+            for name, (calls, total, _) in sorted(self.spans.items()):
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {total:.6f}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {calls}')
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_metric_name(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+_default = Recorder()
+_current = ContextVar("recorder", default=_default)
+
+
+def current_recorder():
+    return _current.get()
+
+
+@contextmanager
+def recording(recorder=None):
+    """Send spans and counters in this context to `recorder` (a new one by default)"""
+    recorder = recorder if recorder is not None else Recorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def span(name):
+    return current_recorder().span(name)
+
+
+def count(name, value=1):
+    current_recorder().count(name, value)
+
+
+def add_span(name, seconds):
+    current_recorder().add_span(name, seconds)
+
+
+def timed(name):
+    """Decorator: run every call of the function inside `span(name)`"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiling(recorder=None, cpu=True, memory=True, top=25):
+    """Capture cProfile (top functions by cumulative time) and tracemalloc (peak, top allocation sites)"""
+    recorder = recorder if recorder is not None else current_recorder()
+    profiler = cProfile.Profile() if cpu else None
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            recorder.profile = out.getvalue()
+        if memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sites = tracemalloc.take_snapshot().statistics("lineno")[:top]
+            recorder.memory = {
+                "current_mb": round(current / 2**20, 2),
+                "peak_mb": round(peak / 2**20, 2),
+                "top_allocations": [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+                                    f"{stat.size / 2**20:.2f} MiB in {stat.count} blocks" for stat in sites],
+            }
+            if started_tracing:
+                tracemalloc.stop()
+
+
+@contextmanager
+def instrumented(profile=False):
+    """A fresh recorder for one run, profiled with cProfile and tracemalloc when `profile` is set"""
+    with recording() as recorder:
+        if profile:
+            with profiling(recorder):
+                yield recorder
+        else:
+            yield recorder
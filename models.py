@@ -0,0 +1,198 @@
+"""
+Lazy model registry for the Smart Resume Ranker.
+
+Importing sentence_transformers pulls in torch, which takes several seconds;
+loading the model takes a few more. Nothing here imports either until a model
+is first requested, so keyword-only (TF-IDF) use starts without them. Models
+are built once per process and shared; `warm_up` loads one ahead of time (in
+a background thread with `wait=False`) and runs a tiny encode so the first real
+request doesn't pay for lazy kernel initialization.
+
+Encoder backends (RESUME_RANKER_ENCODER_BACKEND or `--backend`):
+
+- torch: the PyTorch fp32 model (default)
+- torch-int8: the same model with its Linear layers dynamically quantized to int8
+- onnx: the exported ONNX model run by onnxruntime (needs optimum[onnxruntime])
+- onnx-int8: the int8-quantized ONNX export from the model repository
+
+RESUME_RANKER_ENCODER_THREADS sets the intra-op thread count and
+RESUME_RANKER_ENCODE_BATCH_SIZE the encode batch size. Embeddings from a
+non-default backend are cached under their own key, so they never mix with
+fp32 ones. `benchmarks/encoder_parity.py` checks a backend against fp32.
+
+`python models.py` prints a startup report: how long importing the ranking
+library takes and which heavy modules it loaded.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+ENCODER_BACKEND = os.environ.get("RESUME_RANKER_ENCODER_BACKEND", "torch")
+ENCODER_THREADS = int(os.environ.get("RESUME_RANKER_ENCODER_THREADS", 0))  # 0: the library's default
+ENCODE_BATCH_SIZE = int(os.environ.get("RESUME_RANKER_ENCODE_BATCH_SIZE", 32))
+ONNX_INT8_FILE = os.environ.get("RESUME_RANKER_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "onnxruntime", "sklearn")
+WARM_UP_TEXT = "Warm-up sentence for the resume ranker."
+
+_IMPORTED_AT = time.perf_counter()
+
+
+# ----------- Backends -----------
+def _load_torch(model_name, threads):
+    import torch
+    from sentence_transformers import SentenceTransformer  # deferred: imports torch
+    if threads:
+        torch.set_num_threads(threads)
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _load_torch_int8(model_name, threads):
+    import torch
+    model = _load_torch(model_name, threads)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name, threads, file_name=None):
+    import onnxruntime
+    from sentence_transformers import SentenceTransformer
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+    model_kwargs = {"provider": "CPUExecutionProvider", "session_options": options}
+    if file_name:
+        model_kwargs["file_name"] = file_name
+    return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+
+def _load_onnx_int8(model_name, threads):
+    return _load_onnx(model_name, threads, file_name=ONNX_INT8_FILE)
+
+
+LOADERS = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+    "onnx-int8": _load_onnx_int8,
+}
+BACKENDS = tuple(LOADERS)
+
+
+def embedding_key(model_name, backend="torch"):
+    """Name embeddings are cached under; non-fp32 backends get their own namespace"""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+# ----------- Registry -----------
+class ModelRegistry:
+    """Builds models on first use and keeps one instance per (name, backend)"""
+
+    def __init__(self, backend=ENCODER_BACKEND, threads=ENCODER_THREADS, batch_size=ENCODE_BATCH_SIZE):
+        self.loaders = dict(LOADERS)
+        self.backend = backend
+        self.threads = threads
+        self.batch_size = batch_size
+        self._models = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.load_seconds = {}
+        self.warm_up_seconds = {}
+        self._warm_up_threads = {}
+
+    def configure(self, backend=None, threads=None, batch_size=None):
+        """Change the default backend, thread count or batch size for models loaded from now on"""
+        if backend is not None:
+            if backend not in self.loaders:
+                raise ValueError(f"Unknown encoder backend '{backend}' (choose from {', '.join(self.loaders)})")
+            self.backend = backend
+        if threads is not None:
+            self.threads = threads
+        if batch_size is not None:
+            self.batch_size = batch_size
+
+    def register(self, backend, loader):
+        """Add a backend; `loader(model_name, threads)` returns an object with `encode`"""
+        self.loaders[backend] = loader
+
+    def _name_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, name=MODEL_NAME, backend=None):
+        """The model called `name` on `backend`, loading it now if this is the first request"""
+        key = (name, backend or self.backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._name_lock(key):  # concurrent callers wait for one load
+            if key not in self._models:
+                if key[1] not in self.loaders:
+                    raise ValueError(f"Unknown encoder backend '{key[1]}' (choose from {', '.join(self.loaders)})")
+                start = time.perf_counter()
+                model = self.loaders[key[1]](name, self.threads)
+                model.embedding_key = embedding_key(*key)
+                self._models[key] = model
+                self.load_seconds[key] = time.perf_counter() - start
+            return self._models[key]
+
+    def is_loaded(self, name=MODEL_NAME, backend=None):
+        return (name, backend or self.backend) in self._models
+
+    def warm_up(self, name=MODEL_NAME, wait=True):
+        """Load a model and run one encode; with wait=False this happens in a background thread"""
+        key = (name, self.backend)
+        if not wait:
+            with self._lock:
+                thread = self._warm_up_threads.get(key)
+                if thread is None or not thread.is_alive() and key not in self.warm_up_seconds:
+                    thread = threading.Thread(target=self.warm_up, args=(name,), daemon=True)
+                    self._warm_up_threads[key] = thread
+                    thread.start()
+            return thread
+        model = self.get(name)
+        if key not in self.warm_up_seconds:
+            start = time.perf_counter()
+            model.encode([WARM_UP_TEXT])
+            self.warm_up_seconds[key] = time.perf_counter() - start
+        return model
+
+    def report(self):
+        """Startup timings and which heavy modules this process has imported so far"""
+        return {
+            "seconds_since_import": round(time.perf_counter() - _IMPORTED_AT, 3),
+            "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+            "backend": self.backend,
+            "threads": self.threads,
+            "batch_size": self.batch_size,
+            "models": {embedding_key(*key): {"load_seconds": round(seconds, 3),
+                                             "warm_up_seconds": round(self.warm_up_seconds.get(key, 0.0), 3)}
+                       for key, seconds in self.load_seconds.items()},
+        }
+
+
+REGISTRY = ModelRegistry()
+
+
+def get_model(name=MODEL_NAME, backend=None):
+    return REGISTRY.get(name, backend)
+
+
+def startup_report():
+    return REGISTRY.report()
+
+
+def main():
+    start = time.perf_counter()
+    import ranker  # noqa: F401
+    report = {"import_ranker_seconds": round(time.perf_counter() - start, 3)}
+    if "--warm-up" in sys.argv[1:]:
+        REGISTRY.warm_up()
+    report.update(startup_report())
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Hard-requirement queries for the Smart Resume Ranker.
+
+A recruiter's non-negotiables are written as a boolean query and checked
+against a term index of the resumes before anything is scored:
+
+    python AND (aws OR gcp) AND "machine learning" NOT intern
+
+- terms are matched as whole tokens (the tokenizer in tokens.py, so "c++",
+  "node.js" and "ci/cd" work); a term that tokenizes to several tokens, such
+  as "scikit-learn", is a phrase
+- "quoted text" is a phrase: its tokens must appear consecutively
+- AND, OR and NOT (any case) combine them, with parentheses for grouping;
+  NOT binds tightest, then AND, then OR, and terms side by side are ANDed
+
+`TermIndex` keeps a sorted posting list of resume IDs per token. Terms are
+posting-list lookups, AND/OR/NOT are sorted-array intersections, unions and
+differences, and phrases are confirmed, against each resume's token IDs
+(interned int32 arrays, smaller than the text), only on resumes that
+contain all their tokens.
+"""
+
+import re
+
+import numpy as np
+
+from skills import contains_phrase, intersect_sorted
+from tokens import Vocabulary, token_stream
+
+OPERATORS = ("AND", "OR", "NOT")
+LEXER = re.compile(r'\s*(?:(\()|(\))|"([^"]*)("?)|([^\s()"]+))')
+
+
+class QuerySyntaxError(ValueError):
+    """A requirement query that can't be parsed"""
+
+
+# ----------- Parsing -----------
+def _lex(text):
+    """(kind, value) tokens: "(", ")", "op" or "phrase" (a token tuple)"""
+    lexemes, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = LEXER.match(text, position)
+        if match is None:
+            raise QuerySyntaxError(f"Unexpected character at position {position + 1}")
+        opening, closing, quoted, closed, word = match.groups()
+        if opening or closing:
+            lexemes.append((opening or closing, None))
+        elif quoted is not None:
+            if not closed:
+                raise QuerySyntaxError("Unterminated quote")
+            tokens = token_stream(quoted)
+            if not tokens:
+                raise QuerySyntaxError(f'Empty phrase "{quoted}"')
+            lexemes.append(("phrase", tokens))
+        elif word.upper() in OPERATORS:
+            lexemes.append(("op", word.upper()))
+        else:
+            tokens = token_stream(word)
+            if tokens:  # punctuation-only words match nothing and are dropped
+                lexemes.append(("phrase", tokens))
+        position = match.end()
+    return lexemes
+
+
+class _Parser:
+    """Recursive descent over the lexemes; nodes are ("and"|"or", [children]), ("not", child), ("phrase", tokens)"""
+
+    def __init__(self, lexemes):
+        self.lexemes = lexemes
+        self.position = 0
+
+    def peek(self):
+        return self.lexemes[self.position] if self.position < len(self.lexemes) else (None, None)
+
+    def take(self):
+        lexeme = self.peek()
+        self.position += 1
+        return lexeme
+
+    def parse(self):
+        if not self.lexemes:
+            raise QuerySyntaxError("Empty query")
+        node = self.parse_or()
+        if self.position < len(self.lexemes):
+            raise QuerySyntaxError("Unbalanced ')'")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == ("op", "OR"):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while True:
+            kind, value = self.peek()
+            if (kind, value) == ("op", "AND"):
+                self.take()
+            elif not (kind in ("(", "phrase") or (kind, value) == ("op", "NOT")):
+                break
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_not(self):
+        if self.peek() == ("op", "NOT"):
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.take()
+        if kind == "phrase":
+            return ("phrase", value)
+        if kind == "(":
+            node = self.parse_or()
+            if self.take()[0] != ")":
+                raise QuerySyntaxError("Missing ')'")
+            return node
+        if kind is None:
+            raise QuerySyntaxError("Query ends where a term was expected")
+        raise QuerySyntaxError(f"Expected a term, found {value or kind!r}")
+
+
+def _format(node, parent=None):
+    kind, value = node
+    if kind == "phrase":
+        return value[0] if len(value) == 1 else '"' + " ".join(value) + '"'
+    if kind == "not":
+        return "NOT " + _format(value, "not")
+    text = f" {kind.upper()} ".join(_format(child, kind) for child in value)
+    return f"({text})" if parent is not None else text
+
+
+# ----------- Evaluation -----------
+class Query:
+    """A parsed requirement query"""
+
+    def __init__(self, text):
+        self.text = text
+        self.node = _Parser(_lex(text)).parse()
+
+    def __str__(self):
+        return _format(self.node)
+
+    def __repr__(self):
+        return f"Query({str(self)!r})"
+
+    def phrases(self):
+        """Every phrase the query mentions (negated ones included), as token tuples"""
+        found, stack = [], [self.node]
+        while stack:
+            kind, value = stack.pop()
+            if kind == "phrase":
+                found.append(value)
+            elif kind == "not":
+                stack.append(value)
+            else:
+                stack.extend(reversed(value))
+        return found
+
+    def matches(self, text):
+        """Evaluate against one text without an index"""
+        tokens = token_stream(text)
+        present = set(tokens)
+
+        def evaluate(node):
+            kind, value = node
+            if kind == "phrase":
+                return all(token in present for token in value) and (
+                    len(value) == 1 or contains_phrase(tokens, value))
+            if kind == "not":
+                return not evaluate(value)
+            return (all if kind == "and" else any)(evaluate(child) for child in value)
+        return evaluate(self.node)
+
+    def search(self, index, ids=None):
+        """Sorted IDs of the resumes in a `TermIndex` (optionally only `ids`) that satisfy the query"""
+        universe = (np.arange(len(index), dtype=np.int32) if ids is None
+                    else np.unique(np.asarray(ids, dtype=np.int32)))
+
+        def evaluate(node):
+            kind, value = node
+            if kind == "phrase":
+                return index.phrase(value, universe)
+            if kind == "not":
+                return np.setdiff1d(universe, evaluate(value), assume_unique=True)
+            if kind == "and":
+                result = universe
+                # Plain terms first: their posting lists are cheap and usually shrink the set the most
+                for child in sorted(value, key=lambda child: child[0] != "phrase"):
+                    result = intersect_sorted(result, evaluate(child)) if len(result) else result
+                return result
+            result = universe[:0]
+            for child in value:
+                result = np.union1d(result, evaluate(child))
+            return result
+        return evaluate(self.node)
+
+
+def parse_query(text):
+    """A `Query`, or None for blank text; raises QuerySyntaxError"""
+    return Query(text) if text and text.strip() else None
+
+
+# ----------- Term Index -----------
+def _contains_run(sequence, phrase):
+    """Whether an int array contains `phrase` (an int array) as a contiguous run"""
+    starts = np.flatnonzero(sequence[:len(sequence) - len(phrase) + 1] == phrase[0])
+    for offset in range(1, len(phrase)):
+        starts = starts[sequence[starts + offset] == phrase[offset]]
+    return len(starts) > 0
+
+
+class TermIndex:
+    """Token -> sorted posting list of resume IDs, plus each resume's token IDs to confirm phrases against"""
+
+    def __init__(self):
+        self.names = []
+        self.vocabulary = Vocabulary()
+        self.sequences = []  # per resume: its token stream as vocabulary IDs
+        self._postings = {}  # token -> list of IDs, appended in increasing order
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, text, tokens=None):
+        """Index one resume (`tokens`: its token stream, if already made); returns its ID"""
+        doc_id = len(self.names)
+        tokens = token_stream(text) if tokens is None else tokens
+        self.names.append(name)
+        self.sequences.append(self.vocabulary.intern(tokens))
+        for token in set(tokens):
+            self._postings.setdefault(token, []).append(doc_id)
+        return doc_id
+
+    def add_many(self, items, streams=None):
+        """Add (name, text) pairs, with their token streams if known; returns their IDs"""
+        if streams is None:
+            return [self.add(name, text) for name, text in items]
+        return [self.add(name, text, tokens) for (name, text), tokens in zip(items, streams)]
+
+    def postings(self, token):
+        return np.array(self._postings.get(token, ()), dtype=np.int32)
+
+    def phrase(self, tokens, universe):
+        """Sorted IDs within `universe` whose text contains the tokens consecutively"""
+        candidates = universe
+        for token in sorted(set(tokens), key=lambda token: len(self._postings.get(token, ()))):
+            candidates = intersect_sorted(candidates, self.postings(token))
+            if not len(candidates):
+                return candidates
+        if len(tokens) == 1:
+            return candidates
+        phrase = self.vocabulary.lookup(tokens)  # every token is known: it has a posting list
+        return np.array([doc_id for doc_id in candidates.tolist()
+                         if _contains_run(self.sequences[doc_id], phrase)], dtype=np.int32)
+
+    def filter(self, items, query, streams=None):
+        """Add (name, text) pairs (and their token streams, if known); return those satisfying the query, in order"""
+        items = list(items)
+        ids = self.add_many(items, streams)
+        if query is None:
+            return items
+        passing = set(query.search(self, ids).tolist())
+        return [item for doc_id, item in zip(ids, items) if doc_id in passing]
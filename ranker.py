@@ -0,0 +1,454 @@
+"""
+Resume ranking library for the Smart Resume Ranker.
+
+Everything here runs without Streamlit: the web app (app.py) and the batch
+CLI (cli.py) both build on these functions. Importing this module does not
+import torch, sentence_transformers or scikit-learn; models come from the lazy
+registry in models.py and scikit-learn is imported by the functions that fit a
+vectorizer.
+"""
+
+import os
+
+import numpy as np
+
+from chunking import chunk_resumes, length_bucketed_order, pool_scores
+from corpus_store import content_hash
+from extraction import SUPPORTED_EXTENSIONS, extract_texts, iter_extract_texts
+from instrumentation import count, timed
+from models import MODEL_NAME, REGISTRY, get_model
+from tokens import TokenizedCorpus, Vocabulary, analyze, token_counts, tokenize, top_terms
+
+EMBEDDING_CACHE_DIR = os.environ.get("RESUME_RANKER_EMBEDDING_CACHE", os.path.join(".cache", "embeddings"))
+EXTRACTION_WORKERS = int(os.environ.get("RESUME_RANKER_EXTRACTION_WORKERS", os.cpu_count() or 1))
+EXTRACTION_TIMEOUT = float(os.environ.get("RESUME_RANKER_EXTRACTION_TIMEOUT", 60))
+# Set to an empty string to keep extracted text in memory only
+TEXT_CACHE_DB = os.environ.get("RESUME_RANKER_TEXT_CACHE", os.path.join(".cache", "texts.sqlite3"))
+TFIDF_INDEX_DIR = os.environ.get("RESUME_RANKER_TFIDF_INDEX", os.path.join(".cache", "tfidf_index"))
+VECTOR_INDEX_DIR = os.environ.get("RESUME_RANKER_VECTOR_INDEX", os.path.join(".cache", "vector_index"))
+# Set to an empty string to skip deduplication against the persistent corpus
+CORPUS_DB = os.environ.get("RESUME_RANKER_CORPUS", os.path.join(".cache", "corpus.sqlite3"))
+# A JSON file of {"skill": ["alias", ...]}; empty uses the built-in taxonomy in skills.py
+SKILL_TAXONOMY_FILE = os.environ.get("RESUME_RANKER_SKILL_TAXONOMY", "")
+
+
+# ----------- Model -----------
+def load_model(model_name=MODEL_NAME, backend=None):
+    """The shared model instance on the configured encoder backend, loaded on first use"""
+    return get_model(model_name, backend)
+
+
+# ----------- Text Extraction -----------
+def _read_document(file):
+    """Return (name, bytes) for a path or an uploaded file object"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return os.path.basename(file), f.read()
+    if hasattr(file, "getvalue"):
+        return file.name, file.getvalue()
+    return file.name, file.read()
+
+
+def list_resume_files(directory):
+    """Supported resume files in a directory, sorted by name"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith(SUPPORTED_EXTENSIONS))
+
+
+def _unique_name(name, taken):
+    """`name`, or "name (2).ext", "name (3).ext", ... if it is already in `taken`"""
+    stem, ext = os.path.splitext(name)
+    candidate, i = name, 2
+    while candidate in taken:
+        candidate, i = f"{stem} ({i}){ext}", i + 1
+    taken.add(candidate)
+    return candidate
+
+
+def _read_documents(files):
+    """(name, bytes) for supported files; files sharing a name get numbered so none is overwritten"""
+    documents, taken = [], set()
+    for file in files:
+        name = os.path.basename(file) if isinstance(file, (str, os.PathLike)) else file.name
+        if name.endswith(SUPPORTED_EXTENSIONS):
+            name, data = _read_document(file)
+            documents.append((_unique_name(name, taken), data))
+    return documents
+
+
+def deduplicate_resumes(resumes, corpus, seen=None):
+    """Fold exact duplicate resumes together through a `CorpusStore`.
+
+    Returns (unique, duplicates, near_duplicates): {name: text} with one entry
+    per distinct text, {duplicate name: name it copies} for the exact copies
+    left out, and {name: stored name} for near-duplicates of a stored document
+    (e.g. an updated resume). Near-duplicates stay in `unique` with their
+    uploaded text; only exact copies reuse the stored text. Pass the same
+    `seen` dict across batches to deduplicate a whole upload.
+    """
+    seen = {} if seen is None else seen  # content hash -> name
+    unique, duplicates, near_duplicates = {}, {}, {}
+    for (name, text), (doc_id, kind, _) in zip(resumes.items(), corpus.add_many(resumes.items())):
+        digest = content_hash(text)
+        if digest in seen:
+            duplicates[name] = seen[digest]
+            continue
+        seen[digest] = name
+        if kind == "near":
+            near_duplicates[name] = corpus.name(doc_id)
+            unique[name] = text
+        else:
+            unique[name] = corpus.text(doc_id)
+    return unique, duplicates, near_duplicates
+
+
+def filter_by_skills(resumes, skills, index):
+    """Resumes mentioning every skill, found by posting-list intersection in a `SkillIndex` they are added to"""
+    kept = dict(index.filter(resumes.items(), skills))
+    count("filter.skills.eliminated", len(resumes) - len(kept))
+    return kept
+
+
+def filter_by_query(resumes, query, index, streams=None):
+    """Resumes satisfying a requirement `Query`, evaluated on a `TermIndex` they are added to
+
+    `streams` ({name: token stream}) spares re-tokenizing resumes the caller already tokenized.
+    """
+    kept = dict(index.filter(resumes.items(), query, None if streams is None else [streams[name] for name in resumes]))
+    count("filter.query.eliminated", len(resumes) - len(kept))
+    return kept
+
+
+@timed("load_resume_texts")
+def load_resume_texts(files, max_workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                      progress_callback=None, cache=None, on_error=None, pool=None):
+    """Extract {name: text} from paths or uploaded files; unreadable files go to `on_error(name, message)`
+
+    Pass an `extraction_pool()` as `pool` to reuse warm workers across calls.
+    """
+    documents = _read_documents(files)
+    resumes = {}
+    for name, text, error in extract_texts(documents, max_workers=max_workers, timeout=timeout,
+                                           progress_callback=progress_callback, cache=cache, pool=pool):
+        if error:
+            if on_error:
+                on_error(name, error)
+        elif text:
+            resumes[name] = text
+    return resumes
+
+
+def iter_resume_batches(files, batch_size=32, max_workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                        cache=None, on_error=None, pool=None):
+    """Yield ({name: text}, files_done, files_total) batches as soon as `batch_size` files are extracted
+
+    Pass an `extraction_pool()` as `pool` to reuse warm workers across calls.
+    """
+    documents = _read_documents(files)
+    batch, done = {}, 0
+    for _, name, text, error in iter_extract_texts(documents, max_workers, timeout, cache, pool):
+        done += 1
+        if error:
+            if on_error:
+                on_error(name, error)
+        elif text:
+            batch[name] = text
+        if len(batch) >= batch_size:
+            yield batch, done, len(documents)
+            batch = {}
+    if batch or not documents:
+        yield batch, done, len(documents)
+
+
+# ----------- Ranking Results -----------
+def _top_indices(scores, candidates, n):
+    """The n best of `candidates` by score, best first; ties keep the lower index"""
+    candidate_scores = scores[candidates]
+    if n < len(candidates):
+        # Keep everything tied with the n-th best so the tie-break below is exact
+        threshold = np.partition(candidate_scores, len(candidates) - n)[len(candidates) - n]
+        keep = np.flatnonzero(candidate_scores >= threshold)
+        candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+    return candidates[np.lexsort((candidates, -candidate_scores))[:n]]
+
+
+class Ranking:
+    """Resumes ranked by score, selected with argpartition instead of a full sort.
+
+    Behaves like the list of (name, score) pairs, best first, that the rank
+    functions used to return: it can be iterated, indexed, sliced and measured
+    with len(). It holds the names and one score array; only as much of the
+    order as has been read is computed. `top_k` caps its length and
+    `min_score` drops weaker resumes; `page()` reads past `top_k` on demand.
+    """
+
+    def __init__(self, names, scores, top_k=None, min_score=None):
+        self.names = list(names)
+        self.all_scores = np.asarray(scores).ravel()
+        self._eligible = (np.arange(len(self.all_scores)) if min_score is None
+                          else np.flatnonzero(self.all_scores >= min_score))
+        self.total = len(self._eligible)
+        self.top_k = self.total if top_k is None else max(min(top_k, self.total), 0)
+        self._order = np.zeros(0, dtype=np.intp)
+
+    def _ordered(self, n):
+        """Positions of the n best resumes; the sorted prefix at least doubles when it grows"""
+        n = min(n, self.total)
+        if n > len(self._order):
+            self._order = _top_indices(self.all_scores, self._eligible, min(max(n, 2 * len(self._order)), self.total))
+        return self._order[:n]
+
+    @property
+    def indices(self):
+        """Positions (into the input resumes) of the top_k, best first"""
+        return self._ordered(self.top_k)
+
+    @property
+    def scores(self):
+        """Scores of the top_k, best first"""
+        return self.all_scores[self.indices]
+
+    def _pairs(self, rows):
+        return [(self.names[i], float(self.all_scores[i])) for i in rows]
+
+    def __len__(self):
+        return self.top_k
+
+    def __iter__(self):
+        return iter(self._pairs(self.indices))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            rows = range(*key.indices(self.top_k))
+            return self._pairs(self._ordered(max(rows) + 1)[key] if rows else [])
+        if key < 0:
+            key += self.top_k
+        if not 0 <= key < self.top_k:
+            raise IndexError("ranking index out of range")
+        return self._pairs(self._ordered(key + 1)[key:])[0]
+
+    def page(self, number, size=10):
+        """(name, score) pairs on 1-based page `number`; pages may run past top_k up to `total`"""
+        start = (number - 1) * size
+        return self._pairs(self._ordered(start + size)[start:])
+
+    def page_count(self, size=10):
+        return (self.total + size - 1) // size
+
+    def __repr__(self):
+        return f"Ranking({self[:3]}{'...' if self.top_k > 3 else ''}, top_k={self.top_k}, total={self.total})"
+
+
+# ----------- Keyword Highlighting -----------
+def highlight_keywords(jd_text, resume_text):
+    """Words shared by one JD and one resume; use keyword_matches for many resumes"""
+    jd_words = set(tokenize(jd_text))
+    resume_words = set(tokenize(resume_text))
+    return jd_words.intersection(resume_words)
+
+
+def keyword_matches(jd_text, resumes):
+    """{name: [matched JD words]} for all resumes, tokenizing each document once"""
+    return TokenizedCorpus(resumes).keyword_overlaps(jd_text)
+
+
+@timed("keywords")
+def keyword_analytics(jd_text, resumes, top_n=10, corpus=None):
+    """Matched keywords, top terms per resume, distinctive JD terms and skill gaps in one pass
+
+    Returns {"matched": {name: [...]}, "top_terms": {name: [(term, count)]},
+    "distinctive_terms": [(term, weight)], "skill_gaps": {name: [...]}}.
+    Pass a `TokenizedCorpus` of the resumes as `corpus` if one is already built.
+    """
+    return (corpus if corpus is not None else TokenizedCorpus(resumes)).keyword_report(jd_text, top_n)
+
+
+def get_important_keywords(text, top_n=10):
+    """Extract most important keywords from text"""
+    vocabulary = Vocabulary()
+    ids, counts = token_counts(text, vocabulary)
+    return top_terms(ids, counts, vocabulary, top_n)  # skips words shorter than 3 characters
+
+
+# ----------- TF-IDF Ranking -----------
+@timed("rank.tfidf")
+def rank_resumes_tfidf(jd_text, resumes, index=None, top_k=None, min_score=None, streams=None):
+    """Rank by TF-IDF cosine as a `Ranking`; with a `TfidfIndex`, scores against its persistent IDF instead of refitting
+
+    `streams` ({name: token stream}) lets the index skip re-tokenizing resumes it hasn't seen.
+    """
+    count("rank.tfidf.docs", len(resumes))
+    if index is not None:
+        streams = None if streams is None else [streams[name] for name in resumes]
+        scores, _ = index.score(jd_text, index.ensure(list(resumes.values()), streams))
+        return Ranking(resumes.keys(), scores, top_k, min_score)
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    docs = [jd_text] + list(resumes.values())
+    tfidf = TfidfVectorizer(analyzer=analyze, max_features=1000)
+    tfidf_matrix = tfidf.fit_transform(docs)  # rows are L2-normalized, so cosine is a dot product
+    scores = (tfidf_matrix[1:] @ tfidf_matrix[0].T).toarray().ravel()
+    return Ranking(resumes.keys(), scores, top_k, min_score)
+
+
+# ----------- BERT Semantic Ranking -----------
+@timed("encode")
+def encode_texts(texts, model, store=None, model_name=None):
+    """Embed texts as L2-normalized float32 rows, through `store` when given
+
+    Cached embeddings are keyed by `model_name`, defaulting to the model's
+    registry key so quantized backends don't share fp32 entries.
+    """
+    model_name = model_name or getattr(model, "embedding_key", MODEL_NAME)
+    count("encode.texts", len(texts))
+    if store is not None:
+        embeddings = store.encode(model, model_name, texts, batch_size=REGISTRY.batch_size)
+    else:
+        embeddings = model.encode(list(texts), batch_size=REGISTRY.batch_size, convert_to_numpy=True)
+    embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def rank_by_embeddings(jd_embedding, names, resume_embeddings, top_k=None, min_score=None):
+    """Rank pre-encoded resumes against one pre-encoded job description"""
+    return Ranking(names, resume_embeddings @ jd_embedding, top_k, min_score)
+
+
+@timed("rank.bert")
+def rank_resumes_bert(jd_text, resumes, model=None, store=None, top_k=None, min_score=None):
+    count("rank.bert.docs", len(resumes))
+    model = model if model is not None else load_model()
+    embeddings = encode_texts([jd_text] + list(resumes.values()), model, store)
+    return rank_by_embeddings(embeddings[0], list(resumes.keys()), embeddings[1:], top_k, min_score)
+
+
+@timed("rank.bert_chunked")
+def chunked_bert_scores(jd_texts, resumes, model=None, store=None, pooling="max", max_chunks=None):
+    """M x N scores from section/window chunks, so long resumes are not truncated.
+
+    All chunks of all resumes are encoded in one length-sorted batch; each
+    resume's chunk scores are pooled with `pooling` ("max" or "mean").
+    Returns (scores, ChunkStats).
+    """
+    jd_texts = list(jd_texts)
+    model = model if model is not None else load_model()
+    chunks, owners, chunk_token_counts, stats = chunk_resumes(list(resumes.values()), model, max_chunks=max_chunks)
+    count("chunking.chunks", stats.chunks)
+    count("chunking.tokens", stats.tokens_total)
+    order = length_bucketed_order(chunk_token_counts)
+    embeddings = encode_texts(jd_texts + [chunks[i] for i in order], model, store)
+    m = len(jd_texts)
+    chunk_scores = np.empty((m, len(chunks)), dtype=np.float32)
+    chunk_scores[:, order] = embeddings[:m] @ embeddings[m:].T
+    scores = np.vstack([pool_scores(row, owners, len(resumes), pooling) for row in chunk_scores])
+    return scores, stats
+
+
+def rank_resumes_bert_chunked(jd_text, resumes, model=None, store=None, pooling="max", max_chunks=None,
+                              top_k=None, min_score=None):
+    """Like rank_resumes_bert over chunked resumes; returns (Ranking, ChunkStats)"""
+    scores, stats = chunked_bert_scores([jd_text], resumes, model, store, pooling, max_chunks)
+    return Ranking(resumes.keys(), scores[0], top_k, min_score), stats
+
+
+# ----------- Multi-JD Scoring -----------
+@timed("score.tfidf")
+def score_matrix_tfidf(jd_texts, resumes, index=None):
+    """M x N cosine scores from a single TF-IDF fit over all JDs and resumes (or from `index`)"""
+    jd_texts = list(jd_texts)
+    if index is not None:
+        scores, _ = index.score_many(jd_texts, index.ensure(list(resumes.values())))
+        return scores
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    tfidf = TfidfVectorizer(analyzer=analyze, max_features=1000)
+    tfidf_matrix = tfidf.fit_transform(jd_texts + list(resumes.values()))  # rows are L2-normalized
+    m = len(jd_texts)
+    return (tfidf_matrix[:m] @ tfidf_matrix[m:].T).toarray()
+
+
+@timed("score.bert")
+def score_matrix_bert(jd_texts, resumes, model=None, store=None, pooling=None):
+    """M x N cosine scores from one batched encode and one matrix multiply (chunked when `pooling` is set)"""
+    if pooling:
+        return chunked_bert_scores(jd_texts, resumes, model, store, pooling)[0]
+    jd_texts = list(jd_texts)
+    model = model if model is not None else load_model()
+    embeddings = encode_texts(jd_texts + list(resumes.values()), model, store)
+    m = len(jd_texts)
+    return embeddings[:m] @ embeddings[m:].T
+
+
+def top_k_per_row(scores, k):
+    """Column indices and scores of the k best entries in each row, best first"""
+    scores = np.asarray(scores)
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.intp), empty
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return (np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(candidate_scores, order, axis=1))
+
+
+def rank_resumes_multi(jd_texts, resumes, method="bert", top_k=None, model=None, store=None,
+                       tfidf_index=None, pooling=None, min_score=None):
+    """Rank N resumes against M JDs in one pass.
+
+    Returns (scores, rankings): the full M x N score matrix and, per JD, a
+    `Ranking` of the top_k resumes (all of them when top_k is None).
+    """
+    if method == "bert":
+        scores = score_matrix_bert(jd_texts, resumes, model, store, pooling)
+    else:
+        scores = score_matrix_tfidf(jd_texts, resumes, tfidf_index)
+    names = list(resumes.keys())
+    return scores, [Ranking(names, row, top_k, min_score) for row in scores]
+
+
+# ----------- Vector Index Retrieval -----------
+def add_to_vector_index(index, resumes, model=None, store=None):
+    """Encode and add resumes that are new to `index` or whose text changed; returns (added, updated)"""
+    known = dict(zip(index.ids, index.digests))
+    digests = {name: content_hash(text) for name, text in resumes.items()}
+    changed = {name: text for name, text in resumes.items() if known.get(name, "") != digests[name]}
+    updated = [name for name in changed if name in known]
+    if changed:
+        model = model if model is not None else load_model()
+        index.remove(updated)
+        index.add(list(changed), encode_texts(list(changed.values()), model, store),
+                  [digests[name] for name in changed])
+    return len(changed) - len(updated), len(updated)
+
+
+@timed("vector_index.search")
+def search_vector_index(jd_texts, index, top_k=10, model=None, store=None, **search_params):
+    """Top-k (name, score) lists per JD from a saved vector index"""
+    model = model if model is not None else load_model()
+    return index.search(encode_texts(list(jd_texts), model, store), top_k, **search_params)
+
+
+# ----------- Two-Stage Cascade Ranking -----------
+@timed("rank.cascade")
+def rank_resumes_cascade(jd_text, resumes, shortlist_size=50, bert_weight=0.7, model=None, store=None,
+                         tfidf_index=None, top_k=None, min_score=None):
+    """Shortlist with TF-IDF, then embed and rerank only the shortlist with BERT.
+
+    Returns a `Ranking` of the shortlist, where
+    score = bert_weight * BERT cosine + (1 - bert_weight) * TF-IDF cosine;
+    `top_k` and `min_score` apply to the fused scores.
+    """
+    names = list(resumes.keys())
+    tfidf_scores = score_matrix_tfidf([jd_text], resumes, tfidf_index)[0]
+    shortlist, _ = top_k_per_row(tfidf_scores[None, :], shortlist_size)
+    shortlist = shortlist[0]
+    if bert_weight <= 0:
+        fused = tfidf_scores[shortlist]
+    else:
+        model = model if model is not None else load_model()
+        texts = [resumes[names[i]] for i in shortlist]
+        embeddings = encode_texts([jd_text] + texts, model, store)
+        bert_scores = embeddings[1:] @ embeddings[0]
+        fused = bert_weight * bert_scores + (1 - bert_weight) * tfidf_scores[shortlist]
+    return Ranking([names[i] for i in shortlist], fused, top_k, min_score)
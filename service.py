@@ -0,0 +1,362 @@
+"""
+HTTP/JSON ranking service for the Smart Resume Ranker.
+
+One process serves many clients with a single shared model (from the registry
+in models.py) instead of a copy per Streamlit session:
+
+    python service.py --port 8080
+
+    POST /rank     {"job_description": "...", "resumes": {"name": "text", ...},
+                    "method": "bert" | "tfidf", "top_k": 10, "min_score": 0.3}
+                   ("resumes" may also be a list of {"name": ..., "text": ...}; repeated
+                    names are numbered "name (2)", ... as for uploaded files)
+                -> {"method": ..., "total": N, "results": [{"resume": ..., "score": ...}]}
+    GET  /health   queue depth and batching statistics
+    GET  /metrics  stage timings and counters in Prometheus text format
+
+The server is plain asyncio. Encode requests from concurrent clients are
+coalesced by `EncodeBatcher`: the first request opens a batch, which closes
+when it holds `--max-batch-texts` texts or `--max-latency-ms` after that
+request arrived, and runs as one `encode_texts` call on the encoder thread
+(texts repeated across requests, such as a popular JD, are encoded once).
+TF-IDF requests run on a thread pool. When more than `--max-pending-texts`
+texts are waiting for the encoder (or for the TF-IDF pool), new requests of
+that method get 503 with Retry-After instead of queueing without bound.
+
+`benchmarks/replay_load.py` replays a JSONL file of job descriptions
+(default: benchmarks/job_descriptions.jsonl) against a running service.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from cli import add_encoder_arguments, configure_encoder
+from embedding_store import EmbeddingStore
+from instrumentation import add_span, count, current_recorder
+from models import REGISTRY
+from ranker import (EMBEDDING_CACHE_DIR, _unique_name, encode_texts, load_model, rank_by_embeddings,
+                    rank_resumes_tfidf)
+
+MAX_BODY_BYTES = 32 * 2**20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class Overloaded(Exception):
+    pass
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------- Dynamic Encode Batching -----------
+class EncodeBatcher:
+    """Coalesces concurrent encode requests into single `encode_texts` calls"""
+
+    def __init__(self, model=None, store=None, max_batch_texts=256, max_latency_ms=10.0,
+                 max_pending_texts=8192):
+        self.model = model
+        self.store = store
+        self.max_batch_texts = max_batch_texts
+        self.max_latency = max_latency_ms / 1000
+        self.max_pending_texts = max_pending_texts
+        self.pending_texts = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.batched_texts = 0
+        self.rejected = 0
+        self._queue = None
+        self._task = None
+        # One encoder thread: the model already uses every core for a batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encoder")
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def encode(self, texts):
+        """Embeddings for `texts`, encoded together with whatever other requests are waiting"""
+        if self.pending_texts and self.pending_texts + len(texts) > self.max_pending_texts:
+            self.rejected += 1
+            count("service.rejected")
+            raise Overloaded(f"{self.pending_texts} texts already waiting for the encoder")
+        future = asyncio.get_running_loop().create_future()
+        self.pending_texts += len(texts)
+        self._queue.put_nowait((texts, future, time.perf_counter()))
+        return await future
+
+    def _encode(self, texts):
+        model = self.model if self.model is not None else load_model()
+        start = time.perf_counter()
+        embeddings = encode_texts(texts, model, self.store)
+        add_span("service.encode_batch", time.perf_counter() - start)
+        return embeddings
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = batch[0][2] + self.max_latency
+            while size < self.max_batch_texts:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:  # past the budget, but requests already queued still ride along
+                    if self._queue.empty():
+                        break
+                    item = self._queue.get_nowait()
+                else:
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                size += len(item[0])
+            unique = list(dict.fromkeys(text for texts, _, _ in batch for text in texts))
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self._encode, unique)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                row = {text: i for i, text in enumerate(unique)}
+                for texts, future, _ in batch:
+                    if not future.done():  # the client may have gone away
+                        future.set_result(embeddings[[row[text] for text in texts]])
+            finally:
+                self.pending_texts -= size
+                self.batches += 1
+                self.batched_requests += len(batch)
+                self.batched_texts += len(unique)
+                count("service.encode_batches")
+
+    def stats(self):
+        return {
+            "pending_texts": self.pending_texts,
+            "batches": self.batches,
+            "mean_requests_per_batch": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "mean_texts_per_batch": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+        }
+
+
+# ----------- Ranking Service -----------
+def _parse_rank_request(body):
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError as e:
+        raise RequestError(400, f"invalid JSON: {e}")
+    if not isinstance(request, dict):
+        raise RequestError(400, "expected a JSON object")
+    jd_text = request.get("job_description")
+    resumes = request.get("resumes")
+    if not isinstance(jd_text, str) or not jd_text.strip():
+        raise RequestError(400, "'job_description' must be a non-empty string")
+    if isinstance(resumes, list):  # also accept [{"name": ..., "text": ...}]
+        if not all(isinstance(item, dict) for item in resumes):
+            raise RequestError(400, "'resumes' list items must be objects of {\"name\": ..., \"text\": ...}")
+        items = [(item.get("name", str(i)), item.get("text", "")) for i, item in enumerate(resumes)]
+        if not all(isinstance(name, str) for name, _ in items):
+            raise RequestError(400, "resume names and texts must be strings")
+        # Number repeated names, as for uploaded files, so no resume silently replaces another
+        taken = set()
+        resumes = {_unique_name(name, taken): text for name, text in items}
+    if not isinstance(resumes, dict) or not resumes:
+        raise RequestError(400, "'resumes' must be a non-empty object of {name: text}")
+    if not all(isinstance(name, str) and isinstance(text, str) for name, text in resumes.items()):
+        raise RequestError(400, "resume names and texts must be strings")
+    method = request.get("method", "bert")
+    if method not in ("bert", "tfidf"):
+        raise RequestError(400, "'method' must be 'bert' or 'tfidf'")
+    top_k, min_score = request.get("top_k"), request.get("min_score")
+    # bool is an int subclass, but true/false is never a meaningful count or score
+    if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 0):
+        raise RequestError(400, "'top_k' must be a non-negative integer")
+    if min_score is not None and (not isinstance(min_score, (int, float)) or isinstance(min_score, bool)):
+        raise RequestError(400, "'min_score' must be a number")
+    return jd_text, resumes, method, top_k, min_score
+
+
+class RankingService:
+    def __init__(self, batcher, tfidf_workers=4, max_body_bytes=MAX_BODY_BYTES):
+        self.batcher = batcher
+        self.max_body_bytes = max_body_bytes
+        self.started = time.time()
+        self.requests = 0
+        self.tfidf_pending_texts = 0
+        self.tfidf_rejected = 0
+        self._tfidf_executor = ThreadPoolExecutor(max_workers=tfidf_workers, thread_name_prefix="tfidf")
+
+    async def _rank_tfidf(self, jd_text, resumes, top_k, min_score):
+        """TF-IDF on the thread pool, shed like BERT requests once `max_pending_texts` are waiting"""
+        texts = len(resumes) + 1
+        if self.tfidf_pending_texts and self.tfidf_pending_texts + texts > self.batcher.max_pending_texts:
+            self.tfidf_rejected += 1
+            count("service.rejected")
+            raise Overloaded(f"{self.tfidf_pending_texts} texts already waiting for TF-IDF scoring")
+        self.tfidf_pending_texts += texts
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._tfidf_executor, rank_resumes_tfidf, jd_text, resumes, None, top_k, min_score)
+        finally:
+            self.tfidf_pending_texts -= texts
+
+    async def rank(self, body):
+        jd_text, resumes, method, top_k, min_score = _parse_rank_request(body)
+        if method == "bert":
+            count("rank.bert.docs", len(resumes))
+            embeddings = await self.batcher.encode([jd_text] + list(resumes.values()))
+            ranking = rank_by_embeddings(embeddings[0], list(resumes.keys()), embeddings[1:], top_k, min_score)
+        else:
+            ranking = await self._rank_tfidf(jd_text, resumes, top_k, min_score)
+        return {"method": method, "total": ranking.total,
+                "results": [{"resume": name, "score": round(score, 6)} for name, score in ranking]}
+
+    def health(self):
+        return {"status": "ok", "uptime_seconds": round(time.time() - self.started, 1),
+                "requests": self.requests, "encoder": REGISTRY.backend,
+                "model_loaded": REGISTRY.is_loaded(), "batching": self.batcher.stats(),
+                "tfidf": {"pending_texts": self.tfidf_pending_texts, "rejected": self.tfidf_rejected}}
+
+    async def dispatch(self, method, path, body):
+        """(status, payload, content type) for one request"""
+        route = urlsplit(path).path
+        if route == "/rank":
+            if method != "POST":
+                return 405, {"error": "use POST"}, "application/json"
+            return 200, await self.rank(body), "application/json"
+        if route == "/health":
+            return 200, self.health(), "application/json"
+        if route == "/metrics":
+            return 200, current_recorder().to_prometheus(), "text/plain; version=0.0.4"
+        return 404, {"error": f"no route {route}"}, "application/json"
+
+    # ----------- HTTP/1.1 -----------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "malformed Content-Length"}, keep_alive=False)
+                    break
+                if length > self.max_body_bytes:
+                    await self._respond(writer, 413, {"error": f"body over {self.max_body_bytes} bytes"},
+                                        keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                await self._respond(writer, *await self._serve(method, path, body), keep_alive=keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, method, path, body):
+        self.requests += 1
+        count("service.requests")
+        start = time.perf_counter()
+        try:
+            return await self.dispatch(method, path, body)
+        except RequestError as e:
+            return e.status, {"error": str(e)}, "application/json"
+        except Overloaded as e:
+            return 503, {"error": f"overloaded: {e}"}, "application/json"
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, "application/json"
+        finally:
+            add_span("service.request", time.perf_counter() - start)
+
+    async def _respond(self, writer, status, payload, content_type="application/json", keep_alive=True):
+        body = (payload if isinstance(payload, str) else json.dumps(payload)).encode("utf-8")
+        headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                   f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8080, service=None, ready=None):
+    """Run the service until cancelled; `ready` (an asyncio.Event) is set once it is listening"""
+    service = service if service is not None else RankingService(EncodeBatcher())
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    try:
+        print(f"Serving on http://{host}:{port}", file=sys.stderr)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume ranking over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-texts", type=int, default=256, help="Close an encode batch at this many texts")
+    parser.add_argument("--max-latency-ms", type=float, default=10.0,
+                        help="Longest a request waits for its encode batch to fill")
+    parser.add_argument("--max-pending-texts", type=int, default=8192,
+                        help="Reject requests with 503 beyond this many texts waiting for the encoder "
+                             "(or, for TF-IDF, for the scoring threads)")
+    parser.add_argument("--tfidf-workers", type=int, default=4, help="Threads scoring TF-IDF requests")
+    parser.add_argument("--embedding-cache", default=EMBEDDING_CACHE_DIR,
+                        help="Embedding store directory ('' to disable)")
+    parser.add_argument("--warm-up", action="store_true", help="Load the model before accepting requests")
+    add_encoder_arguments(parser)
+    args = parser.parse_args(argv)
+    configure_encoder(args)
+    if args.warm_up:
+        REGISTRY.warm_up()
+    store = EmbeddingStore(args.embedding_cache) if args.embedding_cache else None
+    batcher = EncodeBatcher(store=store, max_batch_texts=args.max_batch_texts,
+                            max_latency_ms=args.max_latency_ms, max_pending_texts=args.max_pending_texts)
+    try:
+        asyncio.run(serve(args.host, args.port, RankingService(batcher, args.tfidf_workers)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
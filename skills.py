@@ -0,0 +1,321 @@
+"""
+Section-aware resume parsing and the skill index for the Smart Resume Ranker.
+
+`split_sections` cuts a resume (or job description) into sections at heading
+lines such as "TECHNICAL SKILLS", "PROFESSIONAL EXPERIENCE" or
+"Requirements:", the layouts in sample_resumes.py. `SkillTaxonomy` maps skill
+names and their aliases ("gcp", "google cloud platform") to one canonical
+skill and finds them in token streams; the built-in taxonomy can be replaced
+with a JSON file of {"skill": ["alias", ...]} (RESUME_RANKER_SKILL_TAXONOMY).
+
+`SkillIndex` parses each resume once as it is added and keeps, per skill, a
+sorted posting list of resume IDs. Must-have skills then select candidates by
+intersecting posting lists, shortest first, before anything is scored:
+
+    index = SkillIndex(taxonomy)
+    ids = index.add_many(resumes.items())
+    passing = index.search(["python", "aws"], ids)
+"""
+
+import json
+import re
+from array import array
+
+import numpy as np
+
+from tokens import token_stream
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies",
+               "competencies", "skills and tools", "technical proficiencies"),
+    "experience": ("experience", "professional experience", "work experience", "employment",
+                   "employment history", "work history", "relevant experience"),
+    "education": ("education", "academic background", "education and training"),
+    "certifications": ("certifications", "certificates", "licenses and certifications"),
+    "projects": ("projects", "personal projects", "key projects"),
+    "publications": ("publications",),
+    "achievements": ("achievements", "awards", "honors", "honors and awards"),
+    "interests": ("interests", "hobbies"),
+    # Job description layouts
+    "requirements": ("requirements", "qualifications", "required skills", "minimum qualifications",
+                     "must have", "what you need", "what we are looking for"),
+    "preferred": ("nice to have", "preferred qualifications", "preferred skills", "preferred",
+                  "bonus points", "good to have"),
+    "responsibilities": ("responsibilities", "key responsibilities", "what you will do", "the role"),
+}
+SECTIONS = ("header", *SECTION_HEADINGS)  # text before the first heading is "header"
+_HEADINGS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+# A heading alone on its line, optionally followed by ":" and content ("Skills: Python, SQL")
+HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?P<title>" + "|".join(
+        r"[ \t]+".join("(?:and|&)" if word == "and" else re.escape(word) for word in heading.split())
+        for heading in sorted(_HEADINGS, key=len, reverse=True)
+    ) + r")[ \t]*(?::(?P<rest>[^\n]*))?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+DEFAULT_SKILLS = {
+    "python": ["python"],
+    "java": ["java"],
+    "javascript": ["javascript", "js"],
+    "typescript": ["typescript"],
+    "c++": ["c++"],
+    "c#": ["c#"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "scala": ["scala"],
+    "sql": ["sql", "t-sql", "pl/sql"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "react": ["react", "react.js", "reactjs"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js"],
+    "node.js": ["node.js", "nodejs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring boot", "spring framework", "spring mvc"],
+    ".net": [".net", "asp.net"],
+    "rest api": ["restful", "rest api", "rest apis", "restful api", "restful apis"],
+    "graphql": ["graphql"],
+    "machine learning": ["machine learning"],
+    "deep learning": ["deep learning"],
+    "neural networks": ["neural network", "neural networks"],
+    "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision"],
+    "reinforcement learning": ["reinforcement learning"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "keras": ["keras"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "mlops": ["mlops"],
+    "mlflow": ["mlflow"],
+    "kubeflow": ["kubeflow"],
+    "statistics": ["statistics", "statistical analysis"],
+    "a/b testing": ["a/b testing", "a/b test", "a/b tests"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "hadoop": ["hadoop"],
+    "kafka": ["kafka", "apache kafka"],
+    "airflow": ["airflow", "apache airflow"],
+    "etl": ["etl"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi"],
+    "excel": ["microsoft excel", "ms excel", "excel vba"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "jenkins": ["jenkins"],
+    "ci/cd": ["ci/cd"],
+    "git": ["git", "github", "gitlab"],
+    "linux": ["linux"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb"],
+    "redis": ["redis"],
+    "agile": ["agile", "scrum"],
+    "jira": ["jira"],
+    "figma": ["figma"],
+    "photoshop": ["photoshop", "adobe photoshop"],
+    "salesforce": ["salesforce"],
+    "hubspot": ["hubspot"],
+    "google analytics": ["google analytics"],
+    "seo": ["seo", "search engine optimization"],
+    "social media marketing": ["social media marketing"],
+}
+
+
+# ----------- Sections -----------
+def _section_name(title):
+    return _HEADINGS[" ".join(title.lower().replace("&", "and").split())]
+
+
+def split_sections(text):
+    """{section: text} split at heading lines; text before the first heading goes to "header" """
+    sections = {}
+    current, start = "header", 0
+    for match in HEADING_PATTERN.finditer(text):
+        body = text[start:match.start()].strip()
+        if body:
+            sections[current] = f"{sections[current]}\n{body}" if current in sections else body
+        current, start = _section_name(match["title"]), match.start("rest") if match["rest"] else match.end()
+    body = text[start:].strip()
+    if body:
+        sections[current] = f"{sections[current]}\n{body}" if current in sections else body
+    return sections
+
+
+# ----------- Taxonomy -----------
+class SkillTaxonomy:
+    """Canonical skills and their aliases, matched as token phrases
+
+    Only the listed aliases are matched in text; a skill's own name is a
+    match phrase only when it is listed too, so entries like "go": ["golang"]
+    keep everyday words out. Names and aliases both resolve user input.
+    """
+
+    def __init__(self, skills=None):
+        skills = DEFAULT_SKILLS if skills is None else skills
+        self.skills = sorted(skills)
+        self._aliases = {}  # name or alias tokens -> skill
+        self._phrases = {}  # first token -> [(alias tokens, skill)], longest first
+        for skill, aliases in skills.items():
+            tokens = token_stream(skill)
+            if tokens:
+                self._aliases.setdefault(tokens, skill)
+            for alias in set(aliases):
+                tokens = token_stream(alias)
+                if tokens:
+                    self._aliases[tokens] = skill
+                    self._phrases.setdefault(tokens[0], []).append((tokens, skill))
+        for phrases in self._phrases.values():
+            phrases.sort(key=lambda phrase: -len(phrase[0]))
+
+    @classmethod
+    def load(cls, path=None):
+        """The taxonomy in a JSON file of {"skill": ["alias", ...]}, or the built-in one"""
+        if not path:
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def canonical(self, name):
+        """The skill a name or alias stands for, or None"""
+        return self._aliases.get(token_stream(name))
+
+    def resolve(self, names):
+        """Canonical skills for user-given names; raises ValueError on names outside the taxonomy"""
+        skills, unknown = [], []
+        for name in names:
+            name = name.strip()
+            if not name:
+                continue
+            skill = self.canonical(name)
+            if skill is None:
+                unknown.append(name)
+            elif skill not in skills:
+                skills.append(skill)
+        if unknown:
+            raise ValueError(f"Unknown skill(s): {', '.join(unknown)} (not in the skill taxonomy)")
+        return skills
+
+    def find_tokens(self, tokens):
+        """Skills whose aliases occur in a token sequence"""
+        tokens = tuple(tokens)
+        found = set()
+        for first in self._phrases.keys() & set(tokens):
+            for phrase, skill in self._phrases[first]:
+                if skill not in found and (len(phrase) == 1 or contains_phrase(tokens, phrase)):
+                    found.add(skill)
+        return found
+
+    def find(self, text):
+        return self.find_tokens(token_stream(text))
+
+
+def contains_phrase(tokens, phrase):
+    """Whether a token tuple contains `phrase` (a tuple of tokens) as a contiguous run"""
+    start = -1
+    try:
+        while True:
+            start = tokens.index(phrase[0], start + 1)
+            if tokens[start:start + len(phrase)] == phrase:
+                return True
+    except ValueError:
+        return False
+
+
+def parse_resume(text, taxonomy):
+    """(sections, skills): {section: text} and {skill: [sections it appears in]}"""
+    sections = split_sections(text)
+    skills = {}
+    for section, body in sections.items():
+        for skill in taxonomy.find(body):
+            skills.setdefault(skill, []).append(section)
+    return sections, skills
+
+
+def jd_skill_requirements(jd_text, taxonomy):
+    """(required, preferred) skills of a job description, by section
+
+    Required skills come from requirement/skills sections (the whole text when
+    it has none); preferred ones from "nice to have" style sections.
+    """
+    sections = split_sections(jd_text)
+    required_text = "\n".join(sections[name] for name in ("requirements", "skills") if name in sections)
+    required = taxonomy.find(required_text if required_text else jd_text)
+    preferred = taxonomy.find(sections.get("preferred", "")) - required
+    return sorted(required), sorted(preferred)
+
+
+# ----------- Skill Index -----------
+def intersect_sorted(small, large):
+    """Sorted IDs in both sorted arrays, by binary search of the shorter into the longer"""
+    if not len(small) or not len(large):
+        return small[:0]
+    positions = np.searchsorted(large, small).clip(max=len(large) - 1)
+    return small[large[positions] == small]
+
+
+class SkillIndex:
+    """Skill -> sorted posting list of resume IDs, built as resumes are added"""
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy if taxonomy is not None else SkillTaxonomy()
+        self.names = []
+        self.skill_sections = []  # per resume: {skill: [sections]}
+        self._postings = {}       # skill -> array of IDs, appended in increasing order
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, text):
+        """Parse one resume into the index; returns its ID"""
+        doc_id = len(self.names)
+        _, skills = parse_resume(text, self.taxonomy)
+        self.names.append(name)
+        self.skill_sections.append(skills)
+        for skill in skills:
+            self._postings.setdefault(skill, array("i")).append(doc_id)
+        return doc_id
+
+    def add_many(self, items):
+        """Add (name, text) pairs; returns their IDs"""
+        return [self.add(name, text) for name, text in items]
+
+    def postings(self, skill):
+        return np.array(self._postings.get(skill, array("i")), dtype=np.int32)
+
+    def skills(self, doc_id):
+        """{skill: [sections]} found in one resume"""
+        return self.skill_sections[doc_id]
+
+    def search(self, skills, ids=None):
+        """Sorted IDs of resumes with every skill, optionally within `ids`"""
+        lists = [self.postings(skill) for skill in skills]
+        if ids is not None:
+            lists.append(np.unique(np.asarray(ids, dtype=np.int32)))
+        if not lists:
+            return np.arange(len(self.names), dtype=np.int32)
+        lists.sort(key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            result = intersect_sorted(result, postings)
+            if not len(result):
+                break
+        return result
+
+    def filter(self, items, skills):
+        """Add (name, text) pairs and return those with every skill, in order"""
+        items = list(items)
+        ids = self.add_many(items)
+        if not skills:
+            return items
+        passing = set(self.search(skills, ids).tolist())
+        return [item for doc_id, item in zip(ids, items) if doc_id in passing]
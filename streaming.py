@@ -0,0 +1,356 @@
+"""
+Memory-bounded streaming ranking for the Smart Resume Ranker.
+
+`load_resume_texts` keeps every resume in memory, which is fine for an upload
+of a few hundred files but not for an archive of 100k. Here resumes are read
+one at a time from a ZIP archive or a directory tree, extracted in fixed-size
+batches through one shared worker pool, scored batch by batch and dropped:
+
+- full text is appended to a spill file on disk (only its offset is kept)
+- per JD, every resume's score and keyword-overlap count go into compact
+  float32/int32 arrays, and the best `top_k` into a bounded heap (none when
+  `top_k` is None and only the full arrays are read)
+
+so peak memory depends on the batch size and top_k, not on how many resumes
+stream through. BERT scores each batch as soon as it is encoded. TF-IDF needs
+the corpus-wide IDF first, so it makes two passes: the first counts document
+frequencies while spilling text, the second reads the spill back batch by
+batch and scores it against the final IDF (the same weighting `TfidfIndex`
+uses, with JD terms outside the resume vocabulary ignored).
+
+    with rank_stream(jd_texts, "resumes.zip", method="tfidf", top_k=20) as ranking:
+        for name, score in ranking.top[0]:
+            print(name, score, len(ranking.text(name)))
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+import zipfile
+from array import array
+
+import numpy as np
+import scipy.sparse as sp
+
+from extraction import SUPPORTED_EXTENSIONS, extraction_pool, iter_extract_texts
+from instrumentation import count, timed
+from query import TermIndex
+from ranker import (EXTRACTION_TIMEOUT, EXTRACTION_WORKERS, Ranking, encode_texts, filter_by_query,
+                    filter_by_skills, load_model)
+from skills import SkillIndex, SkillTaxonomy
+from tokens import TokenizedCorpus, analyze
+
+STREAM_BATCH_SIZE = int(os.environ.get("RESUME_RANKER_STREAM_BATCH_SIZE", 256))
+STREAM_METHODS = ("bert", "tfidf")
+
+
+# ----------- Sources -----------
+def iter_source_documents(source):
+    """Yield (name, bytes) for supported resumes in a ZIP archive (path or file object) or directory tree.
+
+    Names are paths relative to the source, so files with the same basename in
+    different folders stay distinct. Only one file's bytes are held at a time.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, file_name)
+                    with open(path, "rb") as f:
+                        yield os.path.relpath(path, source).replace(os.sep, "/"), f.read()
+        return
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.endswith(SUPPORTED_EXTENSIONS) \
+                    and not os.path.basename(info.filename).startswith("._"):  # macOS resource forks
+                yield info.filename, archive.read(info)
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_text_batches(documents, batch_size=STREAM_BATCH_SIZE, max_workers=EXTRACTION_WORKERS,
+                      timeout=EXTRACTION_TIMEOUT, cache=None, on_error=None):
+    """Extract a stream of (name, bytes) in batches; yields lists of (name, text) in input order"""
+    pool = extraction_pool(max_workers) if max_workers > 1 else None
+    try:
+        for batch in _batched(documents, batch_size):
+            texts = [None] * len(batch)
+            for i, name, text, error in iter_extract_texts(batch, max_workers, timeout, cache, pool):
+                if error:
+                    if on_error:
+                        on_error(name, error)
+                elif text:
+                    texts[i] = (name, text)
+            yield [item for item in texts if item is not None]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+# ----------- Spill File -----------
+class TextSpill:
+    """Append-only UTF-8 text store on disk; each text is addressed by (offset, length)"""
+
+    def __init__(self, directory=None):
+        self._own_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix="resume_spill_") if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"texts-{os.getpid()}-{id(self):x}.bin")
+        self._file = open(self.path, "w+b")
+        self.size = 0
+
+    def append(self, text):
+        data = text.encode("utf-8")
+        self._file.seek(self.size)
+        self._file.write(data)
+        offset, self.size = self.size, self.size + len(data)
+        return offset, len(data)
+
+    def read(self, offset, length):
+        self._file.seek(offset)
+        return self._file.read(length).decode("utf-8")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if self._own_directory:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            else:
+                os.remove(self.path)
+
+
+# ----------- Bounded Top-K -----------
+class TopK:
+    """The k highest-scoring items seen so far, in O(k) memory; ties keep the earlier item"""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []  # min-heap of (score, -sequence, item)
+        self._seen = 0
+
+    def push(self, score, item):
+        entry = (score, -self._seen, item)
+        self._seen += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def push_many(self, scores, items):
+        """Push a batch, skipping everything below the current threshold without touching the heap"""
+        scores = np.asarray(scores)
+        if len(self._heap) >= self.k:
+            candidates = np.flatnonzero(scores >= self._heap[0][0])
+            self._seen += len(scores)
+            start = self._seen - len(scores)
+            for i in candidates:
+                entry = (float(scores[i]), -(start + int(i)), items[i])
+                if entry > self._heap[0]:
+                    heapq.heapreplace(self._heap, entry)
+            return
+        for score, item in zip(scores.tolist(), items):
+            self.push(score, item)
+
+    def items(self):
+        """(score, item) pairs, best first"""
+        return [(score, item) for score, _, item in sorted(self._heap, reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+# ----------- Results -----------
+class StreamingRanking:
+    """Scores of every streamed resume, the top-k per JD and the spilled texts; close() deletes the spill"""
+
+    def __init__(self, jd_count, top_k, spill):
+        self.names = []
+        self.offsets = array("q")
+        self.lengths = array("q")
+        self.scores = [array("f") for _ in range(jd_count)]
+        self.overlaps = [array("i") for _ in range(jd_count)]
+        self.heaps = [TopK(top_k) for _ in range(jd_count)] if top_k is not None else []
+        self.spill = spill
+        self.filtered_out = 0  # resumes dropped by must-have skills or the requirement query
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.spill.close()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def top(self):
+        """Per JD, the top-k (name, score) pairs, best first"""
+        return [[(self.names[row], score) for score, row in heap.items()] for heap in self.heaps]
+
+    def top_rows(self, jd=0):
+        """Rows of one JD's top-k, best first, from its heap"""
+        return np.array([row for _, row in self.heaps[jd].items()], dtype=np.intp)
+
+    def score_array(self, jd=0):
+        return np.frombuffer(self.scores[jd], dtype=np.float32)
+
+    def overlap_array(self, jd=0):
+        return np.frombuffer(self.overlaps[jd], dtype=np.int32)
+
+    def ranked(self, jd=0, limit=None, min_score=None):
+        """(name, score, matched keyword count) for one JD, best first, from the score arrays"""
+        ranking = Ranking(self.names, self.score_array(jd), limit, min_score)
+        overlaps = self.overlap_array(jd)
+        return ((self.names[row], float(ranking.all_scores[row]), int(overlaps[row])) for row in ranking.indices)
+
+    def text(self, name_or_row):
+        """Full text of a streamed resume, read back from the spill file"""
+        row = name_or_row if isinstance(name_or_row, int) else self.names.index(name_or_row)
+        return self.spill.read(self.offsets[row], self.lengths[row])
+
+    def _add(self, name, text):
+        offset, length = self.spill.append(text)
+        self.names.append(name)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        return len(self.names) - 1
+
+    def _record(self, rows, scores, overlaps):
+        """Store a scored batch: scores and overlaps are (JDs x batch) arrays"""
+        for jd in range(len(self.scores)):
+            self.scores[jd].frombytes(np.asarray(scores[jd], dtype=np.float32).tobytes())
+            self.overlaps[jd].frombytes(np.asarray(overlaps[jd], dtype=np.int32).tobytes())
+            if self.heaps:
+                self.heaps[jd].push_many(scores[jd], rows)
+
+
+# ----------- Streaming TF-IDF -----------
+class _DocumentFrequencies:
+    """Vocabulary and document frequencies accumulated over a stream"""
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.df = array("q")
+        self.documents = 0
+
+    def add(self, text):
+        self.documents += 1
+        for token in set(analyze(text)):
+            column = self.vocabulary.get(token)
+            if column is None:
+                column = self.vocabulary[token] = len(self.vocabulary)
+                self.df.append(0)
+            self.df[column] += 1
+
+    def idf(self):
+        """Smoothed IDF, as in TfidfVectorizer and TfidfIndex"""
+        df = np.frombuffer(self.df, dtype=np.int64) if len(self.df) else np.zeros(0)
+        return np.log((1 + self.documents) / (1 + df)) + 1
+
+    def vectors(self, texts, idf):
+        """L2-normalized TF-IDF rows over the accumulated vocabulary; unknown terms are dropped"""
+        indptr, indices = [0], []
+        for text in texts:
+            columns = [self.vocabulary[token] for token in analyze(text) if token in self.vocabulary]
+            indices.extend(columns)
+            indptr.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = sp.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                               shape=(len(texts), len(self.vocabulary)))
+        counts.sum_duplicates()
+        weighted = counts.multiply(idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.diags(1.0 / norms) @ weighted
+
+
+# ----------- Streaming Ranking -----------
+def _filter_batches(batches, must_have, taxonomy, query, ranking):
+    for batch in batches:
+        passing = dict(batch)
+        if must_have:
+            passing = filter_by_skills(passing, must_have, SkillIndex(taxonomy))
+        if query is not None:
+            passing = filter_by_query(passing, query, TermIndex())
+        ranking.filtered_out += len(batch) - len(passing)
+        yield list(passing.items())
+
+
+def _overlaps(jd_texts, batch):
+    corpus = TokenizedCorpus()
+    for name, text in batch:  # add() keeps duplicate names apart, unlike a dict
+        corpus.add(name, text)
+    return np.vstack([corpus.keyword_overlap_counts(jd_text) for jd_text in jd_texts])
+
+
+@timed("rank.stream")
+def rank_stream(jd_texts, source, method="bert", top_k=10, batch_size=STREAM_BATCH_SIZE, model=None,
+                store=None, spill_dir=None, max_workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                cache=None, on_error=None, progress_callback=None, must_have=None, taxonomy=None, query=None):
+    """Rank a ZIP archive, directory or iterable of (name, bytes) against JDs in bounded memory.
+
+    Returns a `StreamingRanking` (use it as a context manager so its spill file
+    is removed); with `top_k=None` it keeps no top-k heaps. `progress_callback(resumes_done)` is called after each batch.
+    With `must_have` skills or a requirement `query`, each batch is filtered
+    through indexes of its own (so memory stays bounded) before it is
+    spilled or scored.
+    """
+    if method not in STREAM_METHODS:
+        raise ValueError(f"Streaming supports {', '.join(STREAM_METHODS)}, not '{method}'")
+    jd_texts = list(jd_texts)
+    if isinstance(source, (str, os.PathLike)) or hasattr(source, "read"):
+        documents = iter_source_documents(source)
+    else:
+        documents = source
+    ranking = StreamingRanking(len(jd_texts), top_k, TextSpill(spill_dir))
+    try:
+        batches = iter_text_batches(documents, batch_size, max_workers, timeout, cache, on_error)
+        if must_have or query is not None:
+            batches = _filter_batches(batches, must_have, taxonomy or SkillTaxonomy(), query, ranking)
+        if method == "bert":
+            model = model if model is not None else load_model()
+            jd_embeddings = encode_texts(jd_texts, model, store)
+            for batch in batches:
+                if not batch:
+                    continue
+                rows = [ranking._add(name, text) for name, text in batch]
+                embeddings = encode_texts([text for _, text in batch], model, store)
+                ranking._record(rows, jd_embeddings @ embeddings.T, _overlaps(jd_texts, batch))
+                count("stream.docs", len(batch))
+                if progress_callback:
+                    progress_callback(len(ranking))
+        else:
+            frequencies = _DocumentFrequencies()
+            for batch in batches:  # pass 1: spill text, count document frequencies
+                for name, text in batch:
+                    ranking._add(name, text)
+                    frequencies.add(text)
+                count("stream.docs", len(batch))
+                if progress_callback:
+                    progress_callback(len(ranking))
+            idf = frequencies.idf()
+            queries = frequencies.vectors(jd_texts, idf)
+            for start in range(0, len(ranking), batch_size):  # pass 2: score the spill against the final IDF
+                rows = list(range(start, min(start + batch_size, len(ranking))))
+                batch = [(ranking.names[row], ranking.text(row)) for row in rows]
+                weights = frequencies.vectors([text for _, text in batch], idf)
+                ranking._record(rows, (queries @ weights.T).toarray(), _overlaps(jd_texts, batch))
+    except BaseException:
+        ranking.close()
+        raise
+    return ranking
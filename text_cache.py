@@ -0,0 +1,68 @@
+"""
+Extracted-text cache for the Smart Resume Ranker.
+
+Text is keyed by the SHA-256 of the uploaded file bytes, qualified with the
+extractor version and PDF page cap (`extraction.text_cache_key`) so a change
+to either re-extracts instead of serving stale text. Lookups hit a bounded
+in-memory LRU first and fall back to an optional SQLite file, so Streamlit
+reruns (and restarts, with the disk tier) never parse the same file twice.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TextCache:
+    def __init__(self, db_path=None, max_memory_entries=2048):
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.db = None
+        self._lock = threading.Lock()
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS texts (digest TEXT PRIMARY KEY, text TEXT NOT NULL)")
+            self.db.commit()
+
+    def _remember(self, digest, text):
+        self.memory[digest] = text
+        self.memory.move_to_end(digest)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, digest):
+        """Return cached text for a digest, or None"""
+        with self._lock:
+            if digest in self.memory:
+                self.memory.move_to_end(digest)
+                return self.memory[digest]
+            if self.db is None:
+                return None
+            row = self.db.execute("SELECT text FROM texts WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            self._remember(digest, row[0])
+            return row[0]
+
+    def put_many(self, items):
+        """Store (digest, text) pairs in both tiers"""
+        items = list(items)
+        with self._lock:
+            for digest, text in items:
+                self._remember(digest, text)
+            if self.db is not None and items:
+                self.db.executemany("INSERT OR REPLACE INTO texts (digest, text) VALUES (?, ?)", items)
+                self.db.commit()
+
+    def put(self, digest, text):
+        self.put_many([(digest, text)])
+
+    def __len__(self):
+        return len(self.memory)
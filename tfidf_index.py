@@ -0,0 +1,267 @@
+"""
+Incremental TF-IDF index for the Smart Resume Ranker.
+
+Resumes are tokenized once when they are added; the index keeps their raw
+term counts as a sparse CSR matrix together with a growing vocabulary and
+document frequencies. Scoring a job description is a single sparse mat-vec
+against the L2-normalized TF-IDF rows, so no vectorizer is refit per query.
+`add_many` and `ensure` add a whole batch as one CSR block, with one document
+frequency update and one row normalization.
+
+IDF weights are recomputed after `idf_refresh_every` additions/removals, or 10%
+churn on small indexes (or on `refresh_idf()`); in between, new rows are
+weighted with the current IDF.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+
+from tokens import analyze
+
+COUNTS_FILE = "counts.npz"
+META_FILE = "meta.json"
+
+
+def text_id(text):
+    """Stable document ID for a resume's text"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_rows(matrix):
+    """L2-normalize the rows of a CSR matrix, in one pass over its data"""
+    matrix = matrix.tocsr()
+    lengths = np.diff(matrix.indptr)
+    norms = np.sqrt(np.bincount(np.repeat(np.arange(matrix.shape[0]), lengths),
+                                weights=matrix.data.astype(np.float64) ** 2, minlength=matrix.shape[0]))
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix((matrix.data / np.repeat(norms, lengths), matrix.indices, matrix.indptr),
+                         shape=matrix.shape)
+
+
+class TfidfIndex:
+    def __init__(self, idf_refresh_every=1000):
+        self.idf_refresh_every = idf_refresh_every
+        self.vocabulary = {}   # term -> column
+        self.doc_ids = []      # row -> doc id
+        self.rows = {}         # doc id -> row (live documents only)
+        self.df = np.zeros(0, dtype=np.int64)
+        self.idf = np.zeros(0)
+        self.counts = sp.csr_matrix((0, 0), dtype=np.float32)
+        self.weights = sp.csr_matrix((0, 0))
+        self.alive = np.zeros(0, dtype=bool)
+        self.changes_since_refresh = 0
+        self._count_blocks = []
+        self._weight_blocks = []
+        self._lock = threading.Lock()
+
+    # ----------- Updates -----------
+    def _vectorize(self, text, grow, tokens=None):
+        columns = {}
+        for token, n in Counter(analyze(text, tokens)).items():
+            column = self.vocabulary.get(token)
+            if column is None:
+                if not grow:
+                    continue
+                column = self.vocabulary[token] = len(self.vocabulary)
+            columns[column] = n
+        indices = np.fromiter(columns.keys(), dtype=np.int64, count=len(columns))
+        values = np.fromiter(columns.values(), dtype=np.float32, count=len(columns))
+        return indices, values
+
+    def _current_idf(self, start=0):
+        """Smoothed IDF (as in TfidfVectorizer) for columns from `start` on"""
+        n = int(self.alive.sum()) + sum(block.shape[0] for block in self._count_blocks)
+        return np.log((1 + n) / (1 + self.df[start:len(self.vocabulary)])) + 1
+
+    def add(self, doc_id, text):
+        """Add or replace one document"""
+        self.add_many([(doc_id, text)])
+
+    def add_many(self, items, streams=None):
+        """Add or replace documents as one CSR block: one df update and one row normalization per call
+
+        `streams` are the texts' token streams, aligned with `items`, when the caller already has them.
+        """
+        items = list(items)
+        streams = [None] * len(items) if streams is None else streams
+        # A doc ID given twice keeps its last text
+        batch = {doc_id: (text, tokens) for (doc_id, text), tokens in zip(items, streams)}
+        if not batch:
+            return
+        with self._lock:
+            for doc_id in batch.keys() & self.rows.keys():
+                self._remove(doc_id)
+            rows = [self._vectorize(text, True, tokens) for text, tokens in batch.values()]
+            width = len(self.vocabulary)
+            indptr = np.cumsum([0] + [len(indices) for indices, _ in rows])
+            indices = np.concatenate([indices for indices, _ in rows])
+            values = np.concatenate([values for _, values in rows])
+            if len(self.df) < width:
+                self.df = np.concatenate([self.df, np.zeros(width - len(self.df), dtype=np.int64)])
+            self.df += np.bincount(indices, minlength=width)  # a column appears at most once per row
+            block = sp.csr_matrix((values, indices, indptr), shape=(len(rows), width))
+            for doc_id in batch:
+                self.rows[doc_id] = len(self.doc_ids)
+                self.doc_ids.append(doc_id)
+            self._count_blocks.append(block)
+            # Existing terms keep their IDF until the next refresh; new terms get one now
+            if len(self.idf) < width:
+                self.idf = np.concatenate([self.idf, self._current_idf(start=len(self.idf))])
+            weighted = sp.csr_matrix((values * self.idf[indices], indices, indptr), shape=block.shape)
+            self._weight_blocks.append(_normalize_rows(weighted))
+            self._note_change(len(batch))
+
+    def ensure(self, texts, streams=None):
+        """Index any texts not seen before (`streams`: their token streams, if known); returns all their doc IDs"""
+        doc_ids = [text_id(text) for text in texts]
+        new = [i for i, doc_id in enumerate(doc_ids) if doc_id not in self.rows]
+        self.add_many([(doc_ids[i], texts[i]) for i in new], None if streams is None else [streams[i] for i in new])
+        return doc_ids
+
+    def _remove(self, doc_id):
+        row = self.rows.pop(doc_id)
+        self._consolidate()
+        self.alive[row] = False
+        self.df[self.counts[row].indices] -= 1
+        self._note_change()
+
+    def remove(self, doc_id):
+        """Remove a document; its row is dropped at the next compaction"""
+        with self._lock:
+            if doc_id in self.rows:
+                self._remove(doc_id)
+
+    def _note_change(self, changes=1):
+        # Small indexes drift quickly, so refresh after 10% churn as well
+        self.changes_since_refresh += changes
+        threshold = min(self.idf_refresh_every, max(1, len(self.rows) // 10))
+        if self.changes_since_refresh >= threshold:
+            self._refresh()
+
+    # ----------- Maintenance -----------
+    def _consolidate(self):
+        """Merge pending row blocks into the main matrices"""
+        if not self._count_blocks:
+            return
+        width = len(self.vocabulary)
+        blocks = [self.counts] + self._count_blocks
+        self.counts = sp.vstack([_widen(b, width) for b in blocks], format="csr")
+        blocks = [self.weights] + self._weight_blocks
+        self.weights = sp.vstack([_widen(b, width) for b in blocks], format="csr")
+        added = sum(block.shape[0] for block in self._count_blocks)
+        self.alive = np.concatenate([self.alive, np.ones(added, dtype=bool)])
+        self._count_blocks = []
+        self._weight_blocks = []
+
+    def _compact(self):
+        """Drop removed rows and renumber the live documents"""
+        if self.alive.all():
+            return
+        keep = np.flatnonzero(self.alive)
+        self.counts = self.counts[keep]
+        self.weights = self.weights[keep]
+        self.doc_ids = [self.doc_ids[i] for i in keep]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self.alive = np.ones(len(keep), dtype=bool)
+
+    def _refresh(self):
+        self._consolidate()
+        self._compact()
+        self.idf = self._current_idf()
+        self.counts = _widen(self.counts, len(self.vocabulary))
+        self.weights = _normalize_rows(self.counts.multiply(self.idf).tocsr()).tocsr()
+        self.changes_since_refresh = 0
+
+    def refresh_idf(self):
+        """Recompute IDF over the live documents and reweight every row"""
+        with self._lock:
+            self._refresh()
+
+    # ----------- Queries -----------
+    def query_vectors(self, texts):
+        """L2-normalized TF-IDF rows for query texts, over the index vocabulary"""
+        rows = [self._vectorize(text, grow=False) for text in texts]
+        indptr = np.cumsum([0] + [len(indices) for indices, _ in rows])
+        indices = np.concatenate([i for i, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+        values = np.concatenate([v for _, v in rows]) if rows else np.zeros(0, dtype=np.float32)
+        matrix = sp.csr_matrix((values, indices, indptr), shape=(len(rows), len(self.vocabulary)))
+        return _normalize_rows(matrix.multiply(self.idf[:len(self.vocabulary)]).tocsr())
+
+    def score_many(self, jd_texts, doc_ids=None):
+        """M x N cosine scores for JDs against `doc_ids` (default: all live documents)"""
+        with self._lock:
+            self._consolidate()
+            weights = _widen(self.weights, len(self.vocabulary))
+            if doc_ids is None and self.alive.all():
+                doc_ids = list(self.doc_ids)
+            else:
+                if doc_ids is None:
+                    doc_ids = list(self.rows)
+                weights = weights[np.array([self.rows[d] for d in doc_ids], dtype=np.int64)]
+            queries = self.query_vectors(jd_texts)
+            return (weights @ queries.T).T.toarray(), doc_ids
+
+    def score(self, jd_text, doc_ids=None):
+        """Cosine scores for one JD (a single sparse mat-vec)"""
+        scores, doc_ids = self.score_many([jd_text], doc_ids)
+        return scores[0], doc_ids
+
+    def row(self, doc_id):
+        """One document's L2-normalized TF-IDF row (1 x vocabulary)"""
+        with self._lock:
+            self._consolidate()
+            return _widen(self.weights[self.rows[doc_id]], len(self.vocabulary))
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ----------- Persistence -----------
+    def save(self, path):
+        with self._lock:
+            self._consolidate()
+            self._compact()
+            os.makedirs(path, exist_ok=True)
+            sp.save_npz(os.path.join(path, COUNTS_FILE), _widen(self.counts, len(self.vocabulary)))
+            terms = sorted(self.vocabulary, key=self.vocabulary.get)
+            meta = {"terms": terms, "doc_ids": self.doc_ids,
+                    "idf_refresh_every": self.idf_refresh_every}
+            tmp_path = os.path.join(path, META_FILE + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or return an empty one if `path` has none"""
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            return cls()
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(idf_refresh_every=meta["idf_refresh_every"])
+        index.vocabulary = {term: i for i, term in enumerate(meta["terms"])}
+        index.doc_ids = meta["doc_ids"]
+        index.rows = {doc_id: row for row, doc_id in enumerate(index.doc_ids)}
+        index.counts = sp.load_npz(os.path.join(path, COUNTS_FILE)).tocsr()
+        index.alive = np.ones(len(index.doc_ids), dtype=bool)
+        index.df = np.bincount(index.counts.indices, minlength=len(index.vocabulary)).astype(np.int64)
+        index._refresh()
+        return index
+
+
+def _widen(matrix, width):
+    """Pad a sparse matrix with empty columns up to `width`"""
+    if matrix.shape[1] == width:
+        return matrix
+    matrix = matrix.tocsr(copy=True)
+    matrix.resize((matrix.shape[0], width))
+    return matrix
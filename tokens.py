@@ -0,0 +1,366 @@
+"""
+Tokenization layer for the Smart Resume Ranker.
+
+`token_stream` lowercases a document and tokenizes it in a single regex pass,
+keeping technical terms such as "c++", "c#", "node.js", ".net" and "ci/cd"
+intact. Nothing is memoized: callers that need several views of a document
+(TF-IDF terms, keyword sets, phrase matching) tokenize it once and pass the
+stream along (the `tokens=` arguments below).
+
+On top of that, every document can be interned into token IDs: a sorted array
+of its distinct IDs plus their counts. Keyword overlap between a job
+description and all resumes is then one sparse column selection over the
+corpus instead of rebuilding Python word sets per resume, and keyword
+analytics (top terms per resume, the JD's distinctive terms, skill gaps) are
+block-wise argpartitions over the same sparse count matrix.
+"""
+
+import re
+
+import numpy as np
+import scipy.sparse as sp
+
+# scikit-learn's ENGLISH_STOP_WORDS (what TfidfVectorizer(stop_words='english') uses), inlined so
+# tokenizing doesn't pay for importing scikit-learn
+STOP_WORDS = frozenset("""
+    a about above across after afterwards again against all almost alone along already also
+    although always am among amongst amoungst amount an and another any anyhow anyone anything
+    anyway anywhere are around as at back be became because become becomes becoming been before
+    beforehand behind being below beside besides between beyond bill both bottom but by call can
+    cannot cant co con could couldnt cry de describe detail do done down due during each eg
+    eight either eleven else elsewhere empty enough etc even ever every everyone everything
+    everywhere except few fifteen fifty fill find fire first five for former formerly forty
+    found four from front full further get give go had has hasnt have he hence her here
+    hereafter hereby herein hereupon hers herself him himself his how however hundred i ie if in
+    inc indeed interest into is it its itself keep last latter latterly least less ltd made many
+    may me meanwhile might mill mine more moreover most mostly move much must my myself name
+    namely neither never nevertheless next nine no nobody none noone nor not nothing now nowhere
+    of off often on once one only onto or other others otherwise our ours ourselves out over own
+    part per perhaps please put rather re same see seem seemed seeming seems serious several she
+    should show side since sincere six sixty so some somehow someone something sometime
+    sometimes somewhere still such system take ten than that the their them themselves then
+    thence there thereafter thereby therefore therein thereupon these they thick thin third this
+    those though three through throughout thru thus to together too top toward towards twelve
+    twenty two un under until up upon us very via was we well were what whatever when whence
+    whenever where whereafter whereas whereby wherein whereupon wherever whether which while
+    whither who whoever whole whom whose why will with within without would yet you your yours
+    yourself yourselves
+""".split())
+
+# Compound terms kept as one token even though they contain "/", "." or "-"
+TECH_TERMS = frozenset({
+    "ci/cd", "a/b", "tcp/ip", "ui/ux", "i/o", "pl/sql", "t-sql", ".net", "asp.net", "ado.net",
+    "node.js", "react.js", "vue.js", "next.js", "express.js", "d3.js", "three.js", "socket.io",
+})
+TECH_SUFFIXES = (".js", ".net", ".io")
+
+# One pass: optional leading dot, alphanumeric runs joined by . / -, trailing + or #
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9]+(?:[./-][a-z0-9]+)*[+#]*")
+JOINERS = re.compile(r"[./+#-]+")
+
+
+# ----------- Preprocess Text -----------
+def clean_text(text):
+    """Legacy normalizer (lowercase, non-alphanumerics to spaces); prefer token_stream"""
+    text = text.lower()
+    text = re.sub(r"[^a-zA-Z0-9 ]", " ", text)
+    return text
+
+
+def _split_compound(token):
+    if token in TECH_TERMS:
+        return (token,)
+    if token[0].isalpha() and token[-1] in "+#" and token.rstrip("+#").isalnum():
+        return (token,)  # c++, c#, f#
+    if token.endswith(TECH_SUFFIXES) and token[0] != ".":
+        return (token,)
+    return tuple(part for part in JOINERS.split(token) if part)
+
+
+def token_stream(text):
+    """All tokens of a text, in order, from one lowercase + regex pass"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.isalnum():
+            tokens.append(token)
+        else:
+            tokens.extend(_split_compound(token))
+    return tuple(tokens)
+
+
+def stem(token):
+    """Light suffix stripping ("skills" -> "skill", "deployed" -> "deploy"); tech terms are untouched"""
+    if len(token) <= 4 or not token.isalpha():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text, stop_words=None, stemming=False, min_length=1, tokens=None):
+    """Tokens of a text with optional stop-word filtering and stemming; `tokens` is its stream if already made"""
+    tokens = token_stream(text) if tokens is None else tokens
+    if stop_words is None and not stemming and min_length <= 1:
+        return list(tokens)
+    result = []
+    for token in tokens:
+        if len(token) < min_length or (stop_words is not None and token in stop_words):
+            continue
+        result.append(stem(token) if stemming else token)
+    return result
+
+
+def analyze(text, tokens=None):
+    """TF-IDF analyzer: stop words and single characters removed, like TfidfVectorizer's defaults"""
+    return tokenize(text, stop_words=STOP_WORDS, min_length=2, tokens=tokens)
+
+
+# ----------- Interning -----------
+class Vocabulary:
+    """Maps terms to dense integer IDs in first-seen order"""
+
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+
+    def intern(self, tokens):
+        ids = np.empty(len(tokens), dtype=np.int32)
+        for i, token in enumerate(tokens):
+            term_id = self.ids.get(token)
+            if term_id is None:
+                term_id = self.ids[token] = len(self.terms)
+                self.terms.append(token)
+            ids[i] = term_id
+        return ids
+
+    def lookup(self, tokens):
+        """IDs of the tokens already in the vocabulary (unknown tokens are skipped)"""
+        return np.array([self.ids[t] for t in tokens if t in self.ids], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+def token_counts(text, vocabulary, tokens=None):
+    """Sorted distinct token IDs of a text and how often each occurs"""
+    ids, counts = np.unique(vocabulary.intern(tokenize(text, tokens=tokens)), return_counts=True)
+    return ids, counts.astype(np.int32)
+
+
+def top_terms(ids, counts, vocabulary, top_n=10, min_length=3):
+    """The top_n most frequent terms (ties keep first-seen order) as (term, count)"""
+    keep = np.array([len(vocabulary.terms[i]) >= min_length for i in ids], dtype=bool)
+    ids, counts = ids[keep], counts[keep]
+    order = top_n_indices(_count_keys(counts, ids), top_n)
+    return [(vocabulary.terms[ids[i]], int(counts[i])) for i in order]
+
+
+# ----------- Top-n Selection -----------
+TOP_N_BLOCK_CELLS = 1 << 22  # dense cells per block in the row-wise selections
+
+
+def _count_keys(counts, columns):
+    """Sort keys ranking by count, then by lower column (first-seen term) on ties"""
+    return counts.astype(np.float64) * (int(columns.max(initial=0)) + 1) - columns
+
+
+def top_n_indices(keys, n):
+    """Positions of the n largest keys, best first, via argpartition"""
+    n = min(n, len(keys))
+    if n <= 0:
+        return np.zeros(0, dtype=np.intp)
+    candidates = np.argpartition(-keys, n - 1)[:n]
+    return candidates[np.argsort(-keys[candidates], kind="stable")]
+
+
+def _dense_top_n(keys, n):
+    """Per row of a 2-D key array, the columns of the n largest finite keys (-1 pads)"""
+    n = min(n, keys.shape[1])
+    if n <= 0:
+        return np.full((keys.shape[0], 0), -1, dtype=np.int64)
+    best = np.argpartition(-keys, n - 1, axis=1)[:, :n]
+    best_keys = np.take_along_axis(keys, best, axis=1)
+    order = np.argsort(-best_keys, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best[~np.isfinite(np.take_along_axis(best_keys, order, axis=1))] = -1
+    return best
+
+
+def _row_blocks(lengths, max_rows=4096):
+    """Split rows into (start, stop) blocks whose padded size stays within TOP_N_BLOCK_CELLS"""
+    start = 0
+    while start < len(lengths):
+        stop = min(len(lengths), start + max_rows)
+        while stop - start > 1 and (stop - start) * int(lengths[start:stop].max()) > TOP_N_BLOCK_CELLS:
+            stop = start + (stop - start) // 2
+        yield start, stop
+        start = stop
+
+
+def csr_row_top_n(matrix, keys, n):
+    """Per row of a CSR matrix, positions into `matrix.data` of the n largest keys (-1 pads)
+
+    `keys` is aligned with `matrix.data`; entries with a non-finite key never
+    rank. Rows are padded into dense blocks and selected with one argpartition
+    per block, so the cost is linear in the number of stored entries.
+    """
+    indptr = matrix.indptr
+    lengths = np.diff(indptr)
+    result = np.full((matrix.shape[0], n), -1, dtype=np.int64)
+    for start, stop in _row_blocks(lengths):
+        block_lengths = lengths[start:stop]
+        width = int(block_lengths.max(initial=0))
+        if width == 0:
+            continue
+        lo, hi = indptr[start], indptr[stop]
+        rows = np.repeat(np.arange(stop - start), block_lengths)
+        positions = np.arange(lo, hi) - np.repeat(indptr[start:stop], block_lengths)
+        padded_keys = np.full((stop - start, width), -np.inf)
+        padded_keys[rows, positions] = keys[lo:hi]
+        best = _dense_top_n(padded_keys, n)
+        # Padded (row, position) back to the entry's offset in matrix.data
+        entries = np.where(best >= 0, indptr[start:stop, None] + best, -1)
+        result[start:stop, :best.shape[1]] = entries
+    return result
+
+
+# ----------- Corpus -----------
+class TokenizedCorpus:
+    """Documents tokenized once into interned ID sets sharing one vocabulary"""
+
+    def __init__(self, texts=None, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.names = []
+        self.ids = []
+        self.counts = []
+        self._matrix = None
+        self._document_frequency = None
+        if texts:
+            for name, text in texts.items():
+                self.add(name, text)
+
+    def add(self, name, text, tokens=None):
+        """Add a document; `tokens` is its token stream if the caller already has it"""
+        ids, counts = token_counts(text, self.vocabulary, tokens)
+        self.names.append(name)
+        self.ids.append(ids)
+        self.counts.append(counts)
+        self._matrix = None
+        self._document_frequency = None
+
+    @property
+    def matrix(self):
+        """Documents x vocabulary CSR matrix of term counts (its sparsity pattern is term presence)"""
+        if self._matrix is None or self._matrix.shape[1] != len(self.vocabulary):
+            indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+            np.cumsum([len(ids) for ids in self.ids], out=indptr[1:])
+            indices = np.concatenate(self.ids) if self.ids else np.zeros(0, dtype=np.int32)
+            data = np.concatenate(self.counts) if self.counts else np.zeros(0, dtype=np.int32)
+            self._matrix = sp.csr_matrix((data, indices, indptr), shape=(len(self.ids), len(self.vocabulary)))
+        return self._matrix
+
+    @property
+    def document_frequency(self):
+        """Number of documents containing each vocabulary term"""
+        if self._document_frequency is None or len(self._document_frequency) != len(self.vocabulary):
+            self._document_frequency = np.bincount(self.matrix.indices, minlength=len(self.vocabulary))
+        return self._document_frequency
+
+    def _term_mask(self, min_length, stop_words):
+        return np.array([len(t) >= min_length and (stop_words is None or t not in stop_words)
+                         for t in self.vocabulary.terms], dtype=bool)
+
+    def _overlap(self, jd_text):
+        jd_ids = np.unique(self.vocabulary.lookup(tokenize(jd_text)))
+        return jd_ids, self.matrix[:, jd_ids].tocsr()
+
+    def keyword_overlap_counts(self, jd_text):
+        """Number of distinct JD words found in each document, aligned with `names`"""
+        _, overlap = self._overlap(jd_text)
+        return overlap.getnnz(axis=1)
+
+    def keyword_overlaps(self, jd_text):
+        """{name: [matched JD words]} for every document, from one sparse pass"""
+        jd_ids, overlap = self._overlap(jd_text)
+        terms = np.array(self.vocabulary.terms, dtype=object)[jd_ids] if len(jd_ids) else np.array([], dtype=object)
+        indptr = overlap.indptr
+        return {name: terms[overlap.indices[indptr[row]:indptr[row + 1]]].tolist()
+                for row, name in enumerate(self.names)}
+
+    def top_keywords(self, name, top_n=10):
+        row = self.names.index(name)
+        return top_terms(self.ids[row], self.counts[row], self.vocabulary, top_n)
+
+    # ----------- Keyword Analytics -----------
+    def top_terms_per_document(self, top_n=10, min_length=3, stop_words=STOP_WORDS):
+        """{name: [(term, count)]} with every document's most frequent terms, in one vectorized pass"""
+        matrix = self.matrix
+        if not self.names:
+            return {}
+        keep = self._term_mask(min_length, stop_words)
+        keys = _count_keys(matrix.data, matrix.indices)
+        keys[~keep[matrix.indices]] = -np.inf
+        best = csr_row_top_n(matrix, keys, top_n)
+        terms = self.vocabulary.terms
+        columns = np.where(best >= 0, matrix.indices[np.maximum(best, 0)], -1).tolist()
+        counts = np.where(best >= 0, matrix.data[np.maximum(best, 0)], 0).tolist()
+        return {name: [(terms[c], n) for c, n in zip(columns[row], counts[row]) if c >= 0]
+                for row, name in enumerate(self.names)}
+
+    def jd_term_weights(self, jd_text, min_length=3, stop_words=STOP_WORDS):
+        """(terms, columns, weights) of a JD's terms; weight is JD count x smoothed corpus IDF
+
+        `columns` is -1 for JD terms that appear in no document of the corpus.
+        """
+        tokens = tokenize(jd_text, stop_words=stop_words, min_length=min_length)
+        terms, counts = np.unique(np.array(tokens, dtype=object), return_counts=True) if tokens else ([], [])
+        terms = list(terms)
+        ids = self.vocabulary.ids
+        columns = np.array([ids.get(t, -1) for t in terms], dtype=np.int64)
+        df = np.zeros(len(terms), dtype=np.int64)
+        known = columns >= 0
+        df[known] = self.document_frequency[columns[known]]
+        idf = np.log((1 + len(self.names)) / (1 + df)) + 1
+        return terms, columns, np.asarray(counts, dtype=np.float64) * idf
+
+    def distinctive_terms(self, jd_text, top_n=10, min_length=3, stop_words=STOP_WORDS):
+        """[(term, weight)] of the JD terms that are frequent in the JD but rare in the corpus"""
+        terms, _, weights = self.jd_term_weights(jd_text, min_length, stop_words)
+        return [(terms[i], float(weights[i])) for i in top_n_indices(weights, top_n)]
+
+    def skill_gaps(self, jd_text, top_n=10, min_length=3, stop_words=STOP_WORDS):
+        """{name: [JD terms missing from the document]}, most distinctive first"""
+        terms, columns, weights = self.jd_term_weights(jd_text, min_length, stop_words)
+        if not self.names:
+            return {}
+        known = np.flatnonzero(columns >= 0)
+        presence = self.matrix[:, columns[known]].tocsr()
+        result = {}
+        block_rows = max(1, TOP_N_BLOCK_CELLS // max(len(terms), 1))
+        for start in range(0, len(self.names), block_rows):
+            stop = min(start + block_rows, len(self.names))
+            keys = np.broadcast_to(weights, (stop - start, len(terms))).copy()
+            if len(known):
+                present = presence[start:stop].toarray() > 0
+                keys[:, known] = np.where(present, -np.inf, weights[known])
+            best = _dense_top_n(keys, top_n)
+            for offset, row in enumerate(best):
+                result[self.names[start + offset]] = [terms[c] for c in row if c >= 0]
+        return result
+
+    def keyword_report(self, jd_text, top_n=10):
+        """Matched keywords, top terms, JD distinctive terms and skill gaps from one corpus"""
+        return {
+            "matched": self.keyword_overlaps(jd_text),
+            "top_terms": self.top_terms_per_document(top_n),
+            "distinctive_terms": self.distinctive_terms(jd_text, top_n),
+            "skill_gaps": self.skill_gaps(jd_text, top_n),
+        }
+
+    def __len__(self):
+        return len(self.names)
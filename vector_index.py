@@ -0,0 +1,252 @@
+"""
+Vector indexes for BERT top-k retrieval in the Smart Resume Ranker.
+
+Two interchangeable backends share one interface (add / search / save / load):
+
+- ExactIndex: brute-force inner product over L2-normalized float32 rows,
+  with argpartition top-k. Exact, and fast enough up to a few 100k rows.
+- IVFIndex: inverted-file index. A spherical k-means coarse quantizer splits
+  the rows into `n_lists` cells; a query only scans the `n_probe` closest
+  cells. Raise `n_probe` for higher recall, lower it for speed.
+
+Rows are keyed by resume name and record the content hash of the text they
+were encoded from, so a resume updated under the same file name is replaced
+rather than kept with its stale vector. Indexes persist to a directory
+(meta.json plus .npy arrays) and are reopened with `load_index`, which
+memory-maps the vectors. Each save writes its arrays under new file names and
+then swaps meta.json in atomically, so a reader never pairs new vectors with
+old ids.
+"""
+
+import json
+import os
+import uuid
+
+import numpy as np
+
+META_FILE = "meta.json"
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores, k):
+    """Indices of the k largest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _rows_kept(ids, removed):
+    removed = set(removed)
+    return np.array([i for i, id_ in enumerate(ids) if id_ not in removed], dtype=np.intp)
+
+
+class ExactIndex:
+    kind = "exact"
+
+    def __init__(self):
+        self.ids = []
+        self.digests = []  # content hash per row (None: unknown, from an older index)
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def add(self, ids, vectors, digests=None):
+        vectors = _normalize(vectors)
+        if len(self.ids) == 0:
+            self.vectors = vectors
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+        self.ids.extend(ids)
+        self.digests.extend(digests if digests is not None else [None] * len(ids))
+
+    def remove(self, ids):
+        """Drop the rows stored under `ids`"""
+        keep = _rows_kept(self.ids, ids)
+        self.ids = [self.ids[i] for i in keep]
+        self.digests = [self.digests[i] for i in keep]
+        self.vectors = self.vectors[keep]
+
+    def search(self, queries, k=10):
+        """Return [(id, score), ...] per query, best first"""
+        queries = _normalize(queries)
+        if not self.ids:
+            return [[] for _ in queries]
+        results = []
+        for scores in queries @ self.vectors.T:
+            results.append([(self.ids[i], float(scores[i])) for i in _top_k(scores, k)])
+        return results
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _params(self):
+        return {}
+
+    def _arrays(self):
+        return {"vectors": self.vectors}
+
+    def _restore(self, params, arrays):
+        self.vectors = arrays["vectors"]
+
+
+class IVFIndex:
+    kind = "ivf"
+
+    def __init__(self, n_lists=None, n_probe=8, train_iters=10, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iters = train_iters
+        self.seed = seed
+        self.ids = []
+        self.digests = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None
+
+    def train(self, vectors):
+        """Fit the coarse quantizer with spherical k-means"""
+        vectors = _normalize(vectors)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        rng = np.random.default_rng(self.seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)]
+        for _ in range(self.train_iters):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = ~np.bincount(assignments, minlength=n_lists).astype(bool)
+            sums[empty] = centroids[empty]  # keep empty cells where they were
+            centroids = _normalize(sums)
+        self.n_lists = n_lists
+        self.centroids = centroids
+
+    def add(self, ids, vectors, digests=None):
+        vectors = _normalize(vectors)
+        if self.centroids is None:
+            self.train(vectors)
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+        if len(self.ids) == 0:
+            self.vectors = vectors
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+        self.assignments = np.concatenate([self.assignments, assignments])
+        self.ids.extend(ids)
+        self.digests.extend(digests if digests is not None else [None] * len(ids))
+        self._lists = None
+
+    def remove(self, ids):
+        """Drop the rows stored under `ids`; the quantizer is kept"""
+        keep = _rows_kept(self.ids, ids)
+        self.ids = [self.ids[i] for i in keep]
+        self.digests = [self.digests[i] for i in keep]
+        self.vectors = self.vectors[keep]
+        self.assignments = self.assignments[keep]
+        self._lists = None
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(self.n_lists + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+        return self._lists
+
+    def search(self, queries, k=10, n_probe=None):
+        """Return [(id, score), ...] per query, best first, scanning n_probe cells"""
+        queries = _normalize(queries)
+        if not self.ids:
+            return [[] for _ in queries]
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        lists = self._inverted_lists()
+        results = []
+        for query, cell_scores in zip(queries, queries @ self.centroids.T):
+            cells = _top_k(cell_scores, n_probe)
+            rows = np.concatenate([lists[c] for c in cells])
+            scores = self.vectors[rows] @ query
+            results.append([(self.ids[rows[i]], float(scores[i])) for i in _top_k(scores, k)])
+        return results
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _params(self):
+        return {"n_lists": self.n_lists, "n_probe": self.n_probe,
+                "train_iters": self.train_iters, "seed": self.seed}
+
+    def _arrays(self):
+        arrays = {"vectors": self.vectors, "assignments": self.assignments}
+        if self.centroids is not None:
+            arrays["centroids"] = self.centroids
+        return arrays
+
+    def _restore(self, params, arrays):
+        self.vectors = arrays["vectors"]
+        self.assignments = np.asarray(arrays["assignments"])
+        self.centroids = arrays.get("centroids")
+
+
+BACKENDS = {
+    ExactIndex.kind: ExactIndex,
+    IVFIndex.kind: IVFIndex,
+}
+
+
+def create_index(kind="exact", **params):
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown vector index backend '{kind}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[kind](**params)
+
+
+def _array_files(meta):
+    """{array name: file name} from a meta.json"""
+    files = meta["arrays"]
+    if isinstance(files, list):  # written before array files were versioned
+        return {name: f"{name}.npy" for name in files}
+    return files
+
+
+def save_index(index, path):
+    """Write the arrays under fresh file names, then atomically replace meta.json to point at them
+
+    The arrays of the version being replaced are kept, so a reader that has
+    just read the old meta.json can still open them; older ones are removed.
+    """
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    previous = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            previous = _array_files(json.load(f))
+    arrays = index._arrays()
+    version = uuid.uuid4().hex[:12]
+    files = {name: f"{name}-{version}.npy" for name in sorted(arrays)}
+    for name, array in arrays.items():
+        np.save(os.path.join(path, files[name]), np.asarray(array))
+    meta = {"kind": index.kind, "params": index._params(), "ids": index.ids, "digests": index.digests,
+            "arrays": files}
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    keep = set(files.values()) | set(previous.values())
+    for file_name in os.listdir(path):
+        if file_name.endswith(".npy") and file_name not in keep:
+            os.remove(os.path.join(path, file_name))
+
+
+def load_index(path, mmap=True):
+    """Open a saved index; vectors are memory-mapped unless mmap=False"""
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    index = create_index(meta["kind"], **meta["params"])
+    arrays = {name: np.load(os.path.join(path, file_name), mmap_mode="r" if mmap else None)
+              for name, file_name in _array_files(meta).items()}
+    index.ids = meta["ids"]
+    index.digests = meta.get("digests", [None] * len(index.ids))
+    index._restore(meta["params"], arrays)
+    return index